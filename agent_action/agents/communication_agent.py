@@ -1,5 +1,6 @@
 import os
 import sys
+import asyncio
 import logging
 from typing import List, Dict
 from pymongo import MongoClient
@@ -13,6 +14,9 @@ logger = logging.getLogger(__name__)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.email_sender import send_email
+from utils.attachment_cache import get_attachment_cache
+from utils.pdf_storage import PdfStorage
+from agents.ranking_agent import RankingAgent, default_min_score
 from config import SENDER_EMAIL
 
 # ✅ Connect to MongoDB
@@ -38,7 +42,8 @@ except Exception as e:
 
 class CommunicationAgent:
     def __init__(self):
-        pass
+        self.attachment_cache = get_attachment_cache()
+        self.pdf_storage = PdfStorage(db)
 
     def generate_email_content(self, jd_title: str, top_matches: List[Dict]) -> str:
         """Generates email for AR Requestor with top matches."""
@@ -75,8 +80,15 @@ class CommunicationAgent:
         )
 
     def fetch_profile_attachments(self, profiles: List[Dict]) -> List[Dict]:
-        """Fetches PDF resumes for given profile IDs from MongoDB."""
-        attachments = []
+        """
+        Fetches PDF resumes for the given profiles, in order.
+
+        PDFs are served from the shared attachment cache when possible; the
+        rest come from a single `$in` query that projects only the name and
+        PDF fields. Attachments carry raw PDF bytes, whether the file is stored
+        as Binary, in GridFS or as a legacy base64 string.
+        """
+        profile_ids = []
         for profile in profiles:
             profile_id = (
                 profile.get("_id")
@@ -84,18 +96,39 @@ class CommunicationAgent:
                 or profile.get("profile._id")
                 or profile.get("profile_id")
             )
-            logger.info(f"🔍 Fetching profile from DB with ID: {profile_id}")
-            if profile_id:
-                try:
-                    record = profile_collection.find_one({"_id": ObjectId(profile_id)})
-                    if record and "pdfFile" in record:
-                        attachments.append({
-                            "filename": f"{record.get('name', 'Profile').replace(' ', '_')}.pdf",
-                            "data": record["pdfFile"]["data"]
-                        })
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not fetch profile with ID {profile_id}: {e}")
-        return attachments
+            if profile_id and ObjectId.is_valid(str(profile_id)):
+                profile_ids.append(str(profile_id))
+            elif profile_id:
+                logger.warning(f"⚠️ Invalid profile ID: {profile_id}")
+        profile_ids = list(dict.fromkeys(profile_ids))
+        if not profile_ids:
+            return []
+
+        cache = self.attachment_cache
+        found = cache.get_many(profile_ids)
+        missing = [pid for pid in profile_ids if pid not in found]
+        if missing:
+            logger.info(f"🔍 Fetching {len(missing)} resume(s) from DB ({len(found)} cached)")
+            try:
+                records = profile_collection.find(
+                    {"_id": {"$in": [ObjectId(pid) for pid in missing]}},
+                    {"name": 1, "pdfFile.data": 1, "pdfFile.gridfsId": 1}
+                )
+                for record in records:
+                    data = self.pdf_storage.read(record.get("pdfFile"))
+                    if not data:
+                        continue
+                    profile_id = str(record["_id"])
+                    filename = f"{record.get('name', 'Profile').replace(' ', '_')}.pdf"
+                    cache.put(profile_id, filename, data)
+                    found[profile_id] = (filename, data)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not fetch profiles {missing}: {e}")
+
+        return [
+            {"filename": found[pid][0], "data": found[pid][1]}
+            for pid in profile_ids if pid in found
+        ]
 
     def send_notification(
     self,
@@ -108,27 +141,22 @@ class CommunicationAgent:
         jd_title = jd_info.get("title", "Unknown Job")
         logger.info(f"📩 Preparing email for JD: {jd_title}")
 
-        top_3_matches = ranked_profiles[:3]
-
-        # Modify list so low-similarity profiles get replaced with placeholder
-        filtered_matches = []
-        for match in top_3_matches:
-            if match.get('similarity_score', 0) >= 0.5:
-                filtered_matches.append(match)
-            else:
-                filtered_matches.append({
-                    "profile_name": "(No profile over 50% similarity found)",
-                    "applicant_name": "",
-                    "similarity_score": 0,
-                    "reasoning": ""
-                })
-
-        # Send only if there is at least one profile ≥ 0.50
-        if any(m.get('similarity_score', 0) >= 0.5 for m in top_3_matches):
-            # Fetch attachments for profiles ≥ 0.50
-            attachments = self.fetch_profile_attachments(
-                [m for m in top_3_matches if m.get('similarity_score', 0) >= 0.5]
-            )
+        # The ranker applies the similarity cutoff (MATCH_MIN_SCORE, default 0.5)
+        min_score = default_min_score()
+        qualifying = RankingAgent().rank_profiles(ranked_profiles, top_k=3, min_score=min_score)
+
+        # Pad the list so low-similarity slots show a placeholder
+        filtered_matches = qualifying + [{
+            "profile_name": f"(No profile over {min_score:.0%} similarity found)",
+            "applicant_name": "",
+            "similarity_score": 0,
+            "reasoning": ""
+        } for _ in range(min(3, len(ranked_profiles)) - len(qualifying))]
+
+        # Send only if there is at least one profile over the cutoff
+        if qualifying:
+            # Fetch attachments for the qualifying profiles
+            attachments = self.fetch_profile_attachments(qualifying)
 
             # Send to AR Requestor with attachments
             email_subject = f"Top 3 Consultant Matches for {jd_title}"
@@ -147,3 +175,22 @@ class CommunicationAgent:
             email_body = self.generate_no_match_email_content(jd_title)
             send_email(recruiter_email, email_subject, email_body)
             logger.info(f"⚠️ Email sent to Recruiter: {recruiter_email} — no matches.")
+
+    async def asend_notification(
+    self,
+    ranked_profiles: List[Dict],
+    jd_info: Dict,
+    ar_requestor_email: str,
+    recruiter_email: str
+    ):
+        """
+        Async variant of `send_notification`. The Mongo attachment lookup and the
+        SMTP session are blocking, so the whole send runs in a worker thread.
+        """
+        await asyncio.to_thread(
+            self.send_notification,
+            ranked_profiles,
+            jd_info,
+            ar_requestor_email,
+            recruiter_email
+        )
@@ -4,10 +4,20 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional, AsyncIterator
 import os
 import json
+import asyncio
+import sys
+import textwrap
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.score_cache import ScoreCache, content_hash, make_pair_key
+from utils.text_compaction import estimate_tokens
+
+# Bump whenever the comparison prompt changes so cached scores are not reused.
+PROMPT_VERSION = "2"
 
 class ComparisonResult(BaseModel):
     profile_name: str = Field(description="Name of the consultant profile.")
@@ -21,14 +31,26 @@ class ComparisonOutput(BaseModel):
 
 
 class ComparisonAgent:
-    def __init__(self, google_api_key: str):
+    def __init__(self, google_api_key: str, batch_size: Optional[int] = None, max_concurrency: Optional[int] = None,
+                 score_cache: Optional[ScoreCache] = None, shard_token_budget: Optional[int] = None):
         model_name = os.getenv("GOOGLE_MODEL", "gemini-2.0-flash")
-        
+        self.model_name = model_name
+        self.score_cache = score_cache
+
+        # Sharding: profiles are split into batches of `batch_size` and scored
+        # concurrently (at most `max_concurrency` LLM calls in flight).
+        # A batch size of 0 sends every profile in a single prompt.
+        self.batch_size = batch_size if batch_size is not None else int(os.getenv("COMPARISON_BATCH_SIZE", "5"))
+        self.max_concurrency = max_concurrency if max_concurrency is not None else int(os.getenv("COMPARISON_MAX_CONCURRENCY", "4"))
+        # Optional cap on estimated profile tokens per shard (0 = no cap)
+        self.shard_token_budget = shard_token_budget if shard_token_budget is not None else int(os.getenv("COMPARISON_SHARD_TOKEN_BUDGET", "0"))
+
         self.llm = ChatGoogleGenerativeAI(model=model_name, google_api_key=google_api_key)
         self.parser = JsonOutputParser(pydantic_object=ComparisonOutput)
 
         self.prompt = PromptTemplate(
-            template = """
+            # Dedented so the rubric's source indentation is not sent as prompt tokens
+            template = textwrap.dedent("""
                 You are an expert recruitment analyst with 15+ years of experience in talent acquisition and candidate assessment. Your task is to compare a Job Description (JD) with several Consultant Profiles and assess their similarity based on skills, experience, and contextual relevance. You must be extremely strict and thorough in your analysis, focusing on core competencies and measurable qualifications.
 
                 <analysis_methodology>
@@ -170,17 +192,119 @@ class ComparisonAgent:
 
                 Output in JSON format following this structure:
                 {format_instructions}
-                """,
+                """).strip(),
             input_variables=["jd_content", "profiles_content"],
             partial_variables={"format_instructions": self.parser.get_format_instructions()}
         )
 
         self.chain = self.prompt | self.llm | self.parser
 
+    def _format_profiles(self, profiles: Dict[str, str]) -> str:
+        """Builds the profiles block of the prompt."""
+        return "".join(
+            f"\n--- Consultant Profile: {name} ---\n{content}\n"
+            for name, content in profiles.items()
+        )
+
+    def _shard_profiles(self, profiles: Dict[str, str]) -> List[Dict[str, str]]:
+        """
+        Splits profiles into batches of at most `batch_size` profiles and, when
+        `shard_token_budget` is set, at most that many estimated profile tokens.
+        """
+        if self.batch_size <= 0 and self.shard_token_budget <= 0:
+            return [profiles]
+
+        shards, current, current_tokens = [], {}, 0
+        for name, content in profiles.items():
+            tokens = estimate_tokens(content)
+            full = (
+                (self.batch_size > 0 and len(current) >= self.batch_size)
+                or (self.shard_token_budget > 0 and current and current_tokens + tokens > self.shard_token_budget)
+            )
+            if full:
+                shards.append(current)
+                current, current_tokens = {}, 0
+            current[name] = content
+            current_tokens += tokens
+        if current:
+            shards.append(current)
+        return shards
+
+    def _build_inputs(self, jd_content: str, shards: List[Dict[str, str]]) -> List[Dict]:
+        return [
+            {"jd_content": jd_content, "profiles_content": self._format_profiles(shard)}
+            for shard in shards
+        ]
+
+    def _parse_comparisons(self, result) -> List[Dict]:
+        return (
+            result.get("comparisons", []) if isinstance(result, dict)
+            else [r.dict() for r in result.comparisons]
+            if isinstance(result, ComparisonOutput)
+            else []
+        )
+
+    def _merge_shard_results(self, shards: List[Dict[str, str]], results: List) -> List[Dict]:
+        """Merges per-shard outputs, logging (and skipping) shards that failed."""
+        comparisons = []
+        for shard, result in zip(shards, results):
+            if isinstance(result, Exception):
+                print(f"❌ Comparison shard failed for {list(shard.keys())}: {result}")
+                continue
+            comparisons.extend(self._parse_comparisons(result))
+        return comparisons
+
+    def _cache_keys(self, jd_content: str, profiles: Dict[str, str]) -> Dict[str, str]:
+        jd_hash = content_hash(jd_content)
+        return {
+            name: make_pair_key(jd_hash, content_hash(content), self.model_name, PROMPT_VERSION)
+            for name, content in profiles.items()
+        }
+
+    def _lookup_cache(self, jd_content: str, profiles: Dict[str, str]):
+        """
+        Splits profiles into cached results and the profiles still to be scored.
+        Cached results are marked with `"cached": True`.
+        """
+        if self.score_cache is None:
+            return [], profiles
+
+        keys = self._cache_keys(jd_content, profiles)
+        found = self.score_cache.get_many(keys.values())
+
+        cached, misses = [], {}
+        for name, content in profiles.items():
+            value = found.get(keys[name])
+            if value is None:
+                misses[name] = content
+            else:
+                cached.append({"profile_name": name, **value, "cached": True})
+        return cached, misses
+
+    def _store_cache(self, jd_content: str, profiles: Dict[str, str], comparisons: List[Dict]):
+        if self.score_cache is None or not comparisons:
+            return
+
+        keys = self._cache_keys(jd_content, profiles)
+        entries = {}
+        for comparison in comparisons:
+            key = keys.get(comparison.get("profile_name"))
+            if key:
+                entries[key] = {
+                    "applicant_name": comparison.get("applicant_name"),
+                    "similarity_score": comparison.get("similarity_score"),
+                    "reasoning": comparison.get("reasoning"),
+                }
+        self.score_cache.put_many(entries)
+
     def compare_documents(self, jd_content: str, profiles: Dict[str, str], jd_id: str = None) -> List[Dict]:
         """
         Compares a JD with consultant profiles and saves the report if jd_id is given.
 
+        Profiles are scored in shards of `batch_size`, with up to `max_concurrency`
+        shards in flight. A failed shard is logged and skipped so the remaining
+        shards still produce results.
+
         Args:
             jd_content: The job description text.
             profiles: Dictionary of profile name to content.
@@ -192,32 +316,170 @@ class ComparisonAgent:
         if not profiles:
             return []
 
-        profiles_text = ""
-        for name, content in profiles.items():
-            profiles_text += f"\n--- Consultant Profile: {name} ---\n{content}\n"
-
         try:
-            result = self.chain.invoke({
-                "jd_content": jd_content,
-                "profiles_content": profiles_text
-            })
-
-            comparisons = (
-                result.get("comparisons", []) if isinstance(result, dict)
-                else [r.dict() for r in result.comparisons]
-                if isinstance(result, ComparisonOutput)
-                else []
+            cached, misses = self._lookup_cache(jd_content, profiles)
+            if not misses:
+                return cached
+
+            shards = self._shard_profiles(misses)
+            results = self.chain.batch(
+                self._build_inputs(jd_content, shards),
+                config={"max_concurrency": self.max_concurrency},
+                return_exceptions=True
             )
+            comparisons = self._merge_shard_results(shards, results)
+            self._store_cache(jd_content, misses, comparisons)
 
             # if jd_id:
             #     self.save_report(jd_id, comparisons)
 
-            return comparisons
+            return cached + comparisons
 
         except Exception as e:
             print(f"❌ Error in ComparisonAgent: {e}")
             return []
 
+    async def acompare_documents(self, jd_content: str, profiles: Dict[str, str], jd_id: str = None) -> List[Dict]:
+        """
+        Async variant of `compare_documents`; shards are scored with `abatch`.
+        """
+        if not profiles:
+            return []
+
+        try:
+            cached, misses = await asyncio.to_thread(self._lookup_cache, jd_content, profiles)
+            if not misses:
+                return cached
+
+            shards = self._shard_profiles(misses)
+            results = await self.chain.abatch(
+                self._build_inputs(jd_content, shards),
+                config={"max_concurrency": self.max_concurrency},
+                return_exceptions=True
+            )
+            comparisons = self._merge_shard_results(shards, results)
+            await asyncio.to_thread(self._store_cache, jd_content, misses, comparisons)
+
+            return cached + comparisons
+
+        except Exception as e:
+            print(f"❌ Error in ComparisonAgent: {e}")
+            return []
+
+    async def astream_comparisons(self, jd_content: str, profiles: Dict[str, str]) -> AsyncIterator[List[Dict]]:
+        """
+        Yields comparison results shard by shard as they complete.
+
+        Cached results (if any) are yielded first, then each LLM shard in
+        completion order. Failed shards are logged and skipped.
+        """
+        if not profiles:
+            return
+
+        cached, misses = await asyncio.to_thread(self._lookup_cache, jd_content, profiles)
+        if cached:
+            yield cached
+        if not misses:
+            return
+
+        shards = self._shard_profiles(misses)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def score(shard: Dict[str, str]):
+            async with semaphore:
+                try:
+                    result = await self.chain.ainvoke(self._build_inputs(jd_content, [shard])[0])
+                except Exception as e:
+                    result = e
+                return shard, result
+
+        tasks = [asyncio.create_task(score(shard)) for shard in shards]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                shard, result = await next_done
+                comparisons = self._merge_shard_results([shard], [result])
+                if comparisons:
+                    await asyncio.to_thread(self._store_cache, jd_content, shard, comparisons)
+                    yield comparisons
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def acompare_matrix(self, jds: Dict[str, str], profiles: Dict[str, str]) -> Dict[str, List[Dict]]:
+        """
+        Scores every JD against every profile.
+
+        Each unique (JD text, profile text) pair is scored at most once: JDs
+        with identical text share results, profile hashes are computed once,
+        all pairs are looked up in the score cache in one round-trip, and the
+        remaining shards of every JD go through a single `abatch` call under
+        the shared `max_concurrency` limit.
+
+        Returns:
+            {jd name: comparison results}; failed shards are logged and skipped.
+        """
+        if not jds or not profiles:
+            return {name: [] for name in jds}
+
+        try:
+            unique_jds: Dict[str, str] = {}
+            for name, content in jds.items():
+                unique_jds.setdefault(content, name)
+
+            profile_hashes = {name: content_hash(content) for name, content in profiles.items()}
+            keys = {
+                jd_text: {
+                    name: make_pair_key(jd_hash, profile_hashes[name], self.model_name, PROMPT_VERSION)
+                    for name in profiles
+                }
+                for jd_text, jd_hash in ((text, content_hash(text)) for text in unique_jds)
+            }
+            found = {}
+            if self.score_cache is not None:
+                found = await asyncio.to_thread(
+                    self.score_cache.get_many, [key for pair_keys in keys.values() for key in pair_keys.values()]
+                )
+
+            results = {text: [] for text in unique_jds}
+            shard_jobs = []
+            for jd_text, pair_keys in keys.items():
+                misses = {}
+                for name, content in profiles.items():
+                    value = found.get(pair_keys[name])
+                    if value is None:
+                        misses[name] = content
+                    else:
+                        results[jd_text].append({"profile_name": name, **value, "cached": True})
+                shard_jobs.extend((jd_text, shard) for shard in self._shard_profiles(misses) if shard)
+
+            if shard_jobs:
+                print(f"🧮 Scoring {len(shard_jobs)} shard(s) across {len(unique_jds)} JD(s)")
+                outputs = await self.chain.abatch(
+                    [self._build_inputs(jd_text, [shard])[0] for jd_text, shard in shard_jobs],
+                    config={"max_concurrency": self.max_concurrency},
+                    return_exceptions=True
+                )
+                entries = {}
+                for (jd_text, shard), output in zip(shard_jobs, outputs):
+                    comparisons = self._merge_shard_results([shard], [output])
+                    results[jd_text].extend(comparisons)
+                    for comparison in comparisons:
+                        key = keys[jd_text].get(comparison.get("profile_name"))
+                        if key and comparison.get("profile_name") in shard:
+                            entries[key] = {
+                                "applicant_name": comparison.get("applicant_name"),
+                                "similarity_score": comparison.get("similarity_score"),
+                                "reasoning": comparison.get("reasoning"),
+                            }
+                if self.score_cache is not None and entries:
+                    await asyncio.to_thread(self.score_cache.put_many, entries)
+
+            return {name: results[content] for name, content in jds.items()}
+
+        except Exception as e:
+            print(f"❌ Error in ComparisonAgent: {e}")
+            return {name: [] for name in jds}
+
     # def save_report(self, jd_id: str, comparison_results: List[Dict], output_dir: str = "reports"):
     #     """
     #     Save the comparison results to a JSON file, overwriting any existing report.
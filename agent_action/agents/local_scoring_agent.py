@@ -0,0 +1,273 @@
+# agent_action/agents/local_scoring_agent.py
+
+import os
+import re
+import sys
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.text_similarity import tokenize
+from utils.resume_sections import segment_text
+from utils.skill_matcher import get_skill_matcher
+
+# Weights mirror the ComparisonAgent scoring rubric.
+WEIGHTS = {
+    "skills": 0.35,
+    "experience": 0.25,
+    "education": 0.15,
+    "soft_skills": 0.15,
+    "industry": 0.10,
+}
+
+INDUSTRIES = {
+    "finance": {"finance", "banking", "fintech", "trading", "insurance", "payments", "investment"},
+    "healthcare": {"healthcare", "hospital", "clinical", "pharma", "medical", "patient", "biotech"},
+    "retail": {"retail", "e-commerce", "ecommerce", "commerce", "supply chain", "logistics"},
+    "telecom": {"telecom", "telecommunications", "5g", "network operator"},
+    "government": {"government", "public sector", "defense", "federal"},
+    "education": {"edtech", "university", "school", "e-learning"},
+    "manufacturing": {"manufacturing", "automotive", "industrial", "iot"},
+    "media": {"media", "advertising", "adtech", "gaming", "entertainment"},
+    "energy": {"energy", "oil", "utilities", "renewable"},
+    "saas": {"saas", "b2b", "enterprise software", "cloud platform"},
+}
+
+DEGREE_LEVELS = [
+    (4, re.compile(r"\b(ph\.?d|doctorate|doctoral)\b", re.IGNORECASE)),
+    (3, re.compile(r"\b(master'?s?|m\.?s\.?c?|m\.?tech|m\.?e\.|mba|m\.?a\.)\b", re.IGNORECASE)),
+    (2, re.compile(r"\b(bachelor'?s?|b\.?s\.?c?|b\.?tech|b\.?e\.|b\.?a\.|undergraduate|degree in)\b", re.IGNORECASE)),
+    (1, re.compile(r"\b(diploma|associate'?s?|certificate)\b", re.IGNORECASE)),
+]
+
+_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:years|yrs)", re.IGNORECASE)
+_RANGE_RE = re.compile(r"\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now|date)\b", re.IGNORECASE)
+_NAME_RE = re.compile(r"^[A-Z][a-zA-Z'.-]+(?:\s+[A-Z][a-zA-Z'.-]+){1,3}$")
+
+
+def _find_terms(text: str, tokens: Set[str], vocabulary: Set[str]) -> Set[str]:
+    """Vocabulary entries present in the text (single tokens or phrases)."""
+    found = {term for term in vocabulary if " " not in term and term in tokens}
+    lowered = text.lower()
+    found.update(
+        term for term in vocabulary
+        if " " in term and re.search(rf"(?<!\w){re.escape(term)}(?!\w)", lowered)
+    )
+    return found
+
+
+def _years_of_experience(text: str) -> float:
+    explicit = [int(y) for y in _YEARS_RE.findall(text) if int(y) < 50]
+    current_year = datetime.now().year
+    spans = []
+    for start, end in _RANGE_RE.findall(text):
+        end_year = current_year if not end[0].isdigit() else int(end)
+        if int(start) <= end_year <= current_year:
+            spans.append((int(start), end_year))
+
+    # Merge overlapping date ranges so concurrent roles are not double counted
+    total = 0
+    merged_end = None
+    for start, end in sorted(spans):
+        if merged_end is None or start > merged_end:
+            total += end - start
+            merged_end = end
+        elif end > merged_end:
+            total += end - merged_end
+            merged_end = end
+    return float(max(explicit + [total])) if (explicit or spans) else 0.0
+
+
+def _degree_level(text: str) -> int:
+    for level, pattern in DEGREE_LEVELS:
+        if pattern.search(text):
+            return level
+    return 0
+
+
+def extract_features(text: str, sections: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Rule-based and lexical features used by the local scorer.
+
+    When the resume has recognizable sections, experience is measured from the
+    experience section only (so study dates do not count as work) and the
+    degree from the education section.
+    """
+    tokens = set(tokenize(text))
+    sections = segment_text(text) if sections is None else sections
+    matcher = get_skill_matcher()
+    return {
+        "tokens": tokens,
+        "skills": set(matcher.extract(text, "technical")),
+        "soft_skills": set(matcher.extract(text, "soft")),
+        "industries": {name for name, words in INDUSTRIES.items() if _find_terms(text, tokens, words)},
+        "years": _years_of_experience(sections.get("experience") or text),
+        "degree": _degree_level(sections.get("education") or text),
+    }
+
+
+def _overlap(required: Set[str], present: Set[str]) -> float:
+    return len(required & present) / len(required) if required else 0.0
+
+
+def _lexical_overlap(jd: Dict, profile: Dict) -> float:
+    return len(jd["tokens"] & profile["tokens"]) / len(jd["tokens"]) if jd["tokens"] else 0.0
+
+
+def score_features(jd: Dict, profile: Dict, skill_overlap: Optional[float] = None) -> Dict[str, float]:
+    """
+    Scores each rubric component between 0.0 and 1.0. `skill_overlap` may be
+    passed in when it was already computed for a batch of profiles.
+    """
+    lexical = _lexical_overlap(jd, profile)
+
+    if jd["skills"]:
+        skills = _overlap(jd["skills"], profile["skills"]) if skill_overlap is None else skill_overlap
+    else:
+        skills = lexical
+
+    if jd["years"]:
+        experience = min(1.0, profile["years"] / jd["years"])
+    else:
+        experience = min(1.0, 0.5 + profile["years"] / 10.0) if profile["years"] else 0.4
+
+    if jd["degree"]:
+        gap = jd["degree"] - profile["degree"]
+        education = 1.0 if gap <= 0 else 0.5 ** gap
+    else:
+        education = 1.0 if profile["degree"] else 0.6
+
+    if jd["soft_skills"]:
+        soft_skills = _overlap(jd["soft_skills"], profile["soft_skills"])
+    else:
+        soft_skills = min(1.0, 0.5 + 0.1 * len(profile["soft_skills"]))
+
+    industry = _overlap(jd["industries"], profile["industries"]) if jd["industries"] else lexical
+
+    return {
+        "skills": skills,
+        "experience": experience,
+        "education": education,
+        "soft_skills": soft_skills,
+        "industry": industry,
+    }
+
+
+def _applicant_name(profile_name: str, text: str) -> str:
+    for line in text.splitlines()[:5]:
+        line = line.strip()
+        if _NAME_RE.match(line):
+            return line.title()
+    stem = os.path.splitext(profile_name)[0]
+    return re.sub(r"[_\-]+", " ", stem).strip().title()
+
+
+class LocalScoringAgent:
+    """
+    Deterministic, offline replacement for the ComparisonAgent.
+
+    Implements the same five weighted rubric components (skills 0.35,
+    experience 0.25, education 0.15, soft skills 0.15, industry 0.10) using
+    rule-based and lexical feature extraction, and returns ComparisonResult
+    dictionaries without any LLM call.
+    """
+
+    def __init__(self):
+        pass
+
+    def score_profile(self, jd_features: Dict, profile_name: str, profile_content: str,
+                      profile_features: Optional[Dict] = None, skill_overlap: Optional[float] = None,
+                      applicant_name: Optional[str] = None) -> Dict:
+        profile_features = profile_features or extract_features(profile_content)
+        components = score_features(jd_features, profile_features, skill_overlap)
+        score = sum(WEIGHTS[name] * value for name, value in components.items())
+
+        matched = sorted(jd_features["skills"] & profile_features["skills"])
+        missing = sorted(jd_features["skills"] - profile_features["skills"])
+        reasoning = "\n".join([
+            f"- Core technical skills: {components['skills']:.0%} (matched: {', '.join(matched) or 'none'})",
+            f"- Missing skills: {', '.join(missing) or 'none'}",
+            f"- Experience: {profile_features['years']:.0f} years vs {jd_features['years']:.0f} required ({components['experience']:.0%})",
+            f"- Education match: {components['education']:.0%}",
+            f"- Soft skills: {components['soft_skills']:.0%}",
+            f"- Industry relevance: {components['industry']:.0%}",
+            "- Scored locally (rule-based, no LLM)",
+        ])
+
+        return {
+            "profile_name": profile_name,
+            "applicant_name": applicant_name or _applicant_name(profile_name, profile_content),
+            "similarity_score": round(score, 3),
+            "reasoning": reasoning,
+        }
+
+    def compare_documents(self, jd_content: str, profiles: Dict[str, str], jd_id: str = None) -> List[Dict]:
+        """
+        Scores every profile against the JD locally.
+
+        Args:
+            jd_content: The job description text.
+            profiles: Dictionary of profile name to content.
+            jd_id: Unused; kept for interface parity with ComparisonAgent.
+
+        Returns:
+            List of dictionaries with comparison results.
+        """
+        if not profiles:
+            return []
+        jd_features = extract_features(jd_content)
+        names = list(profiles)
+        features = [extract_features(profiles[name]) for name in names]
+        # One vectorized pass for the skill overlap of every profile
+        overlap = get_skill_matcher().overlap_matrix([jd_features["skills"]], [f["skills"] for f in features])[0]
+        return [
+            self.score_profile(jd_features, name, profiles[name], profile_features, float(skill_overlap))
+            for name, profile_features, skill_overlap in zip(names, features, overlap)
+        ]
+
+    async def acompare_documents(self, jd_content: str, profiles: Dict[str, str], jd_id: str = None) -> List[Dict]:
+        return await asyncio.to_thread(self.compare_documents, jd_content, profiles, jd_id)
+
+    def compare_matrix(self, jds: Dict[str, str], profiles: Dict[str, str]) -> Dict[str, List[Dict]]:
+        """
+        Scores every JD against every profile.
+
+        Features are extracted once per document (JDs with identical text are
+        scored once) and the skill overlap of all pairs comes from a single
+        matrix product.
+
+        Returns:
+            {jd name: comparison results for every profile}.
+        """
+        if not jds or not profiles:
+            return {name: [] for name in jds}
+
+        unique_jds: Dict[str, str] = {}
+        for name, content in jds.items():
+            unique_jds.setdefault(content, name)
+        jd_texts = list(unique_jds)
+        jd_features = [extract_features(text) for text in jd_texts]
+
+        names = list(profiles)
+        features = [extract_features(profiles[name]) for name in names]
+        applicants = [_applicant_name(name, profiles[name]) for name in names]
+        overlap = get_skill_matcher().overlap_matrix([f["skills"] for f in jd_features], [f["skills"] for f in features])
+
+        by_text = {
+            text: [
+                self.score_profile(jd, name, profiles[name], profile_features, float(skill_overlap), applicant)
+                for name, profile_features, skill_overlap, applicant in zip(names, features, row, applicants)
+            ]
+            for text, jd, row in zip(jd_texts, jd_features, overlap)
+        }
+        return {name: by_text[content] for name, content in jds.items()}
+
+    async def acompare_matrix(self, jds: Dict[str, str], profiles: Dict[str, str]) -> Dict[str, List[Dict]]:
+        return await asyncio.to_thread(self.compare_matrix, jds, profiles)
+
+    async def astream_comparisons(self, jd_content: str, profiles: Dict[str, str]) -> AsyncIterator[List[Dict]]:
+        results = await self.acompare_documents(jd_content, profiles)
+        if results:
+            yield results
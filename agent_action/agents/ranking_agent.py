@@ -1,24 +1,112 @@
 # agent_actions/agents/ranking_agent.py
-from typing import List, Dict
+import os
+import heapq
+from typing import Dict, Iterable, List, Optional
+
+
+def default_min_score() -> float:
+    """Similarity a profile needs to be put forward to the AR requestor."""
+    return float(os.getenv("MATCH_MIN_SCORE", "0.5"))
+
+
+def rank_key(result: Dict) -> tuple:
+    """
+    Sort key for comparison results: highest similarity first, then profile
+    name and ID so equal scores always come out in the same order.
+    """
+    return (
+        -float(result.get('similarity_score', 0.0) or 0.0),
+        str(result.get('profile_name') or ""),
+        str(result.get('profile_id') or result.get('profileId') or ""),
+    )
+
+
+class _Ranked:
+    """Heap entry ordered so the worst-ranked result sits at the top of a min-heap."""
+    __slots__ = ("key", "result")
+
+    def __init__(self, result: Dict):
+        self.key = rank_key(result)
+        self.result = result
+
+    def __lt__(self, other: "_Ranked") -> bool:
+        return self.key > other.key
+
+
+class TopKRanker:
+    """
+    Incremental top-k over comparison results.
+
+    Results can be added shard by shard as they arrive; only the best `k`
+    (and only those scoring at least `min_score`) are kept, in a bounded
+    heap, so memory stays O(k) however many results stream through.
+    """
+
+    def __init__(self, k: int, min_score: Optional[float] = None):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        self.min_score = min_score
+        self.seen = 0
+        self._heap: List[_Ranked] = []
+
+    def add(self, results: Iterable[Dict]):
+        heap = self._heap
+        for result in results:
+            self.seen += 1
+            score = result.get('similarity_score', 0.0) or 0.0
+            if self.min_score is not None and score < self.min_score:
+                continue
+            if len(heap) < self.k:
+                heapq.heappush(heap, _Ranked(result))
+            # Cheap score check first; the full key only matters for ties
+            elif score >= -heap[0].key[0]:
+                entry = _Ranked(result)
+                if heap[0] < entry:
+                    heapq.heapreplace(heap, entry)
+
+    def top(self) -> List[Dict]:
+        """The kept results, best first."""
+        return [entry.result for entry in sorted(self._heap, reverse=True)]
+
+    def __len__(self):
+        return len(self._heap)
+
 
 class RankingAgent:
     def __init__(self):
         pass
 
-    def rank_profiles(self, comparison_results: List[Dict]) -> List[Dict]:
+    def rank_profiles(
+        self,
+        comparison_results: Iterable[Dict],
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None
+    ) -> List[Dict]:
         """
         Ranks consultant profiles based on their similarity scores in descending order.
 
         Args:
-            comparison_results: A list of dictionaries from the ComparisonAgent,
-                                each containing 'profile_name', 'similarity_score', and 'reasoning'.
+            comparison_results: Dictionaries from the ComparisonAgent, each containing
+                                'profile_name', 'similarity_score', and 'reasoning'.
+            top_k: Only return the best `top_k` profiles (heap selection instead of a full sort).
+            min_score: Drop profiles scoring below this similarity.
 
         Returns:
-            A list of dictionaries, sorted by 'similarity_score' in descending order.
+            A list of dictionaries, sorted by 'similarity_score' in descending order,
+            with ties broken by profile name and ID.
         """
         if not comparison_results:
             return []
 
-        # Sort the profiles by similarity_score in descending order
-        ranked_profiles = sorted(comparison_results, key=lambda x: x.get('similarity_score', 0.0), reverse=True)
-        return ranked_profiles
+        if top_k is not None:
+            ranker = TopKRanker(top_k, min_score)
+            ranker.add(comparison_results)
+            return ranker.top()
+        if min_score is not None:
+            comparison_results = (r for r in comparison_results if (r.get('similarity_score') or 0.0) >= min_score)
+        return sorted(comparison_results, key=rank_key)
+
+    def ranker(self, k: int, min_score: Optional[float] = None) -> TopKRanker:
+        """Incremental ranker for results that arrive in shards."""
+        return TopKRanker(k, min_score)
@@ -0,0 +1,105 @@
+# agent_action/agents/registry.py
+
+import os
+import time
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from .comparison_agent import ComparisonAgent
+from .ranking_agent import RankingAgent
+from .communication_agent import CommunicationAgent
+from .report_agent import ReportAgent
+# The local scorer imports utils.skill_matcher; share that module's matcher rather than
+# a second copy loaded as agent_action.utils.skill_matcher
+from .local_scoring_agent import LocalScoringAgent, get_skill_matcher
+
+
+class AgentRegistry:
+    """
+    Holds long-lived agent instances shared across requests.
+
+    Building a ComparisonAgent or ReportAgent creates a Gemini client, output
+    parser and prompt templates; reusing one instance keeps the client's
+    connection pool warm. Each agent is tied to a fingerprint of the settings it
+    was built from and is rebuilt the next time it is requested after those
+    settings change. Requests already holding the old instance finish with it.
+    """
+
+    def __init__(self, score_cache=None):
+        self.score_cache = score_cache
+        self._lock = threading.Lock()
+        self._agents: Dict[str, Tuple[Tuple, object]] = {}
+        self._stats: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _llm_settings() -> Tuple:
+        return (
+            os.getenv("GOOGLE_API_KEY"),
+            os.getenv("GOOGLE_MODEL", "gemini-2.0-flash"),
+        )
+
+    def _get(self, kind: str, settings: Tuple, factory: Callable[[], object]):
+        with self._lock:
+            stats = self._stats.setdefault(kind, {"created": 0, "reused": 0, "rebuilt": 0, "created_at": None})
+            current = self._agents.get(kind)
+            if current is not None and current[0] == settings:
+                stats["reused"] += 1
+                return current[1]
+
+            agent = factory()
+            if current is not None:
+                stats["rebuilt"] += 1
+                print(f"♻️ Configuration changed; rebuilt {kind} agent")
+            stats["created"] += 1
+            stats["created_at"] = time.time()
+            self._agents[kind] = (settings, agent)
+            return agent
+
+    def comparison_agent(self) -> ComparisonAgent:
+        settings = self._llm_settings() + (
+            os.getenv("COMPARISON_BATCH_SIZE"),
+            os.getenv("COMPARISON_MAX_CONCURRENCY"),
+            os.getenv("COMPARISON_SHARD_TOKEN_BUDGET"),
+        )
+        return self._get(
+            "comparison",
+            settings,
+            lambda: ComparisonAgent(google_api_key=settings[0], score_cache=self.score_cache)
+        )
+
+    def report_agent(self) -> ReportAgent:
+        settings = self._llm_settings()
+        return self._get("report", settings, lambda: ReportAgent(google_api_key=settings[0]))
+
+    def local_scoring_agent(self) -> LocalScoringAgent:
+        return self._get("local_scoring", (), LocalScoringAgent)
+
+    def skill_matcher(self):
+        """The process-wide SkillMatcher used by the local scoring agent."""
+        return get_skill_matcher()
+
+    def ranking_agent(self) -> RankingAgent:
+        return self._get("ranking", (), RankingAgent)
+
+    def communication_agent(self) -> CommunicationAgent:
+        return self._get("communication", (), CommunicationAgent)
+
+    def warm_up(self):
+        """Builds the LLM-backed agents up front so the first request does not pay for it."""
+        if not os.getenv("GOOGLE_API_KEY"):
+            print("ℹ️ GOOGLE_API_KEY not set; skipping agent warm-up")
+            return
+        self.comparison_agent()
+        self.report_agent()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                kind: {**stats, "active": kind in self._agents}
+                for kind, stats in self._stats.items()
+            }
+
+    def clear(self):
+        """Drops every cached agent; they are rebuilt lazily on next use."""
+        with self._lock:
+            self._agents.clear()
@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Literal
 import os
 import json
+import asyncio
 from datetime import datetime
 
 
@@ -141,6 +142,22 @@ class ReportAgent:
         self.jd_chain = self.jd_prompt | self.llm | self.parser
         self.profile_chain = self.profile_prompt | self.llm | self.parser
 
+    def _select_chain(self, document_type: Literal["job_description", "profile"]):
+        return self.jd_chain if document_type == "job_description" else self.profile_chain
+
+    def _finalize_report(self, result, document_title: str, document_type: str, analysis_date: str) -> Dict:
+        report_data = (
+            result.dict() if isinstance(result, DocumentReport)
+            else result if isinstance(result, dict)
+            else {"error": "Failed to parse report"}
+        )
+
+        # Ensure document_type is set correctly
+        report_data["document_type"] = document_type
+        report_data["document_title"] = document_title
+        report_data["analysis_date"] = analysis_date
+        return report_data
+
     def generate_document_report(self, 
                                document_content: str, 
                                document_title: str,
@@ -164,29 +181,13 @@ class ReportAgent:
         analysis_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         try:
-            if document_type == "job_description":
-                result = self.jd_chain.invoke({
-                    "document_content": document_content,
-                    "document_title": document_title,
-                    "analysis_date": analysis_date
-                })
-            else:  # profile
-                result = self.profile_chain.invoke({
-                    "document_content": document_content,
-                    "document_title": document_title,
-                    "analysis_date": analysis_date
-                })
-
-            report_data = (
-                result.dict() if isinstance(result, DocumentReport)
-                else result if isinstance(result, dict)
-                else {"error": "Failed to parse report"}
-            )
-
-            # Ensure document_type is set correctly
-            report_data["document_type"] = document_type
-            report_data["document_title"] = document_title
-            report_data["analysis_date"] = analysis_date
+            result = self._select_chain(document_type).invoke({
+                "document_content": document_content,
+                "document_title": document_title,
+                "analysis_date": analysis_date
+            })
+
+            report_data = self._finalize_report(result, document_title, document_type, analysis_date)
 
             if report_id:
                 self.save_report(report_id, report_data)
@@ -197,6 +198,38 @@ class ReportAgent:
             print(f"❌ Error in ReportAgent: {e}")
             return {"error": f"Failed to generate report: {str(e)}"}
 
+    async def agenerate_document_report(self,
+                                        document_content: str,
+                                        document_title: str,
+                                        document_type: Literal["job_description", "profile"],
+                                        report_id: Optional[str] = None) -> Dict:
+        """
+        Async variant of `generate_document_report`. The LLM call uses `ainvoke`
+        and the report file is written from a worker thread.
+        """
+        if not document_content.strip():
+            return {"error": "No document content provided"}
+
+        analysis_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        try:
+            result = await self._select_chain(document_type).ainvoke({
+                "document_content": document_content,
+                "document_title": document_title,
+                "analysis_date": analysis_date
+            })
+
+            report_data = self._finalize_report(result, document_title, document_type, analysis_date)
+
+            if report_id:
+                await asyncio.to_thread(self.save_report, report_id, report_data)
+
+            return report_data
+
+        except Exception as e:
+            print(f"❌ Error in ReportAgent: {e}")
+            return {"error": f"Failed to generate report: {str(e)}"}
+
     def save_report(self, report_id: str, report_data: Dict, output_dir: str = "reports"):
         """
         Save the generated report to a JSON file.
@@ -254,4 +287,22 @@ class ReportAgent:
             document_title=profile_title,
             document_type="profile",
             report_id=report_id
-        ) 
\ No newline at end of file
+        )
+
+    async def agenerate_jd_report(self, jd_content: str, jd_title: str, report_id: Optional[str] = None) -> Dict:
+        """Async variant of `generate_jd_report`."""
+        return await self.agenerate_document_report(
+            document_content=jd_content,
+            document_title=jd_title,
+            document_type="job_description",
+            report_id=report_id
+        )
+
+    async def agenerate_profile_report(self, profile_content: str, profile_title: str, report_id: Optional[str] = None) -> Dict:
+        """Async variant of `generate_profile_report`."""
+        return await self.agenerate_document_report(
+            document_content=profile_content,
+            document_title=profile_title,
+            document_type="profile",
+            report_id=report_id
+        )
@@ -1,6 +1,7 @@
 # agent_actions/app.py
 
 import os
+import atexit
 from dotenv import load_dotenv
 from typing import List, Dict, TypedDict
 from bson import ObjectId
@@ -10,6 +11,7 @@ from agents.comparison_agent import ComparisonAgent
 from agents.ranking_agent import RankingAgent
 from agents.communication_agent import CommunicationAgent
 from utils.document_loader import load_documents_from_folder
+from utils.write_behind import BulkWriter
 from config import GOOGLE_API_KEY, JD_FOLDER, PROFILES_FOLDER
 
 from pymongo import MongoClient
@@ -31,6 +33,11 @@ client = MongoClient(MONGO_URI)
 db = client[DB_NAME]
 comparison_collection = db["ComparisonResult"]
 
+# Sessions are written in batches by a background thread; flushed at exit
+session_writer = BulkWriter(comparison_collection, name="ComparisonResult")
+session_writer.start()
+atexit.register(session_writer.stop)
+
 
 # --- LangGraph State ---
 class AgentState(TypedDict):
@@ -138,8 +145,11 @@ def communicate_node(state: AgentState):
     print(f"Sample result: {results[0] if results else 'None'}")
     print(f"Sample top profile: {top_profiles[0] if top_profiles else 'None'}")
     
-    comparison_collection.insert_one(comparison_doc)
-    print("✅ Successfully stored comparison session in DB.")
+    if session_writer.submit(comparison_doc):
+        print("📝 Queued comparison session for DB write.")
+    else:
+        comparison_collection.insert_one(comparison_doc)
+        print("✅ Successfully stored comparison session in DB.")
 
     return {}
 
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Convert consultant profile PDFs from base64 strings to binary storage.
+
+Usage:
+    python agent_action/migrate_pdf_storage.py [--dry-run] [--batch-size N] [--limit N]
+
+Every `consultantprofiles` document whose `pdfFile.data` is still a base64
+string is rewritten with BSON Binary data (or moved to GridFS when larger than
+PDF_GRIDFS_THRESHOLD_MB), in bulk_write batches. Already-converted documents
+are skipped, so the tool can be re-run after an interruption. Uses MONGODB_URI
+and DB_NAME from the environment.
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from utils.pdf_storage import PdfStorage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default="consultantprofiles")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=None, help="convert at most N documents")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+
+    load_dotenv()
+    mongo_uri = os.getenv("MONGODB_URI")
+    db_name = os.getenv("DB_NAME")
+    if not mongo_uri or not db_name:
+        sys.exit("❌ MONGODB_URI or DB_NAME is not set in environment variables.")
+
+    db = MongoClient(mongo_uri)[db_name]
+    storage = PdfStorage(db)
+    print(f"🔄 Migrating {db_name}.{args.collection} PDFs to binary storage{' (dry run)' if args.dry_run else ''}...")
+    summary = storage.migrate(db[args.collection], batch_size=args.batch_size, dry_run=args.dry_run, limit=args.limit)
+
+    saved = summary["bytes_before"] - summary["bytes_after"]
+    print(f"✅ {summary['converted']}/{summary['scanned']} document(s) converted "
+          f"({summary['gridfs']} to GridFS, {summary['failed']} failed) in {summary['took_ms'] / 1000:.1f}s")
+    print(f"💾 PDF payload {summary['bytes_before'] / 1048576:.1f} MB → {summary['bytes_after'] / 1048576:.1f} MB "
+          f"({saved / 1048576:.1f} MB saved)")
+
+
+if __name__ == "__main__":
+    main()
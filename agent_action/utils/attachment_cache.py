@@ -0,0 +1,92 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class AttachmentCache:
+    """
+    Size-bounded LRU of decoded resume PDFs keyed by profile ID.
+
+    Values are (filename, raw bytes) so repeated notifications for the same
+    consultant skip both the Mongo round-trip and the base64 decode. The cache
+    holds at most `max_bytes` of PDF data; entries older than `ttl_seconds`
+    are refetched so a re-uploaded resume is picked up.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv("ATTACHMENT_CACHE_MB", "64")) * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("ATTACHMENT_CACHE_TTL_SECONDS", "3600"))
+
+        self._entries: "OrderedDict[str, Tuple[str, bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, profile_ids: Iterable[str]) -> Dict[str, Tuple[str, bytes]]:
+        """Returns {profile ID: (filename, pdf bytes)} for cached IDs; missing IDs are omitted."""
+        found = {}
+        now = time.time()
+        with self._lock:
+            for profile_id in profile_ids:
+                entry = self._entries.get(profile_id)
+                if entry is None or now - entry[2] > self.ttl_seconds:
+                    if entry is not None:
+                        self._drop(profile_id)
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(profile_id)
+                found[profile_id] = (entry[0], entry[1])
+                self.hits += 1
+        return found
+
+    def put(self, profile_id: str, filename: str, data: bytes):
+        # A single PDF larger than the whole cache is served but not kept
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if profile_id in self._entries:
+                self._drop(profile_id)
+            self._entries[profile_id] = (filename, data, time.time())
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, profile_id: str):
+        self.invalidate_many([profile_id])
+
+    def invalidate_many(self, profile_ids: Iterable[str]):
+        """Drops cached PDFs for profiles that were edited, re-uploaded or deleted."""
+        with self._lock:
+            for profile_id in profile_ids:
+                if profile_id in self._entries:
+                    self._drop(profile_id)
+
+    def _drop(self, profile_id: str):
+        _, data, _ = self._entries.pop(profile_id)
+        self.size -= len(data)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_default_cache: Optional[AttachmentCache] = None
+_default_lock = threading.Lock()
+
+
+def get_attachment_cache() -> AttachmentCache:
+    """Process-wide AttachmentCache shared by every CommunicationAgent."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = AttachmentCache()
+        return _default_cache
@@ -1,74 +1,474 @@
+import io
 import os
+import json
+import time
+import codecs
+import threading
+import zipfile
+import multiprocessing
+import multiprocessing.util
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
 import fitz  # PyMuPDF
-from docx import Document
 
-def load_txt(file_path: str) -> str:
-    """Load a plain text (.txt) file into a string."""
-    if not os.path.exists(file_path):
-        print(f"❌ File not found: {file_path}")
+from .extraction_cache import ExtractionCache, file_hash, make_extraction_key
+from .resume_sections import pdf_layout_headings, segment_text
+
+
+# A source is a file path, raw bytes, or a binary file-like object.
+Source = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+TXT_CHUNK_SIZE = 64 * 1024
+
+SUPPORTED_EXTENSIONS = {".txt", ".pdf", ".docx"}
+
+# Bump whenever a loader changes what text it extracts; invalidates cached extractions.
+LOADER_VERSION = "3"
+
+# PDF extraction budget (0 = unlimited) and page-parallel settings
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "0"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "0"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+# Set in workers of other process pools (see disable_pdf_pool) so they do not nest pools
+_pdf_pool_disabled = False
+
+def loader_signature() -> str:
+    """Loader version plus the settings that change extracted text; part of every cache key."""
+    return f"{LOADER_VERSION}:{PDF_MAX_PAGES}:{PDF_MAX_CHARS}"
+
+_extraction_cache: Optional[ExtractionCache] = None
+# Set when the cache failed to open, so the failure is reported once per process
+_cache_disabled = False
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Process-wide extraction cache, or None when EXTRACTION_CACHE_ENABLED is false or it failed to open."""
+    global _extraction_cache, _cache_disabled
+    if _cache_disabled or os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    if _extraction_cache is None:
+        try:
+            _extraction_cache = ExtractionCache()
+        except Exception as e:
+            print(f"⚠️ Extraction cache unavailable, parsing without it: {e}")
+            _cache_disabled = True
+            return None
+    return _extraction_cache
+
+def _is_path(source: Source) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+def _describe(source: Source) -> str:
+    return str(source) if _is_path(source) else "<in-memory document>"
+
+def _read_bytes(source: Source) -> bytes:
+    """Returns the full contents of an in-memory source."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    return source.read()
+
+def _decode_stream(stream: BinaryIO, encoding: str) -> str:
+    """Decodes a binary stream chunk by chunk without holding the raw bytes twice."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parts = []
+    while True:
+        chunk = stream.read(TXT_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+def load_txt(source: Source) -> str:
+    """Load a plain text (.txt) file (path, bytes or stream) into a string."""
+    if _is_path(source) and not os.path.exists(source):
+        print(f"❌ File not found: {source}")
         return ""
+    if not _is_path(source):
+        stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+        start = stream.tell() if stream.seekable() else None
+        try:
+            return _decode_stream(stream, "utf-8")
+        except UnicodeDecodeError:
+            print(f"❌ Unicode decode error in {_describe(source)}, trying fallback encoding...")
+            if start is None:
+                print(f"❌ Fallback decoding failed for {_describe(source)}: stream is not seekable")
+                return ""
+            stream.seek(start)
+            return _decode_stream(stream, "latin-1")
+        except Exception as e:
+            print(f"❌ Error reading .txt file {_describe(source)}: {e}")
+            return ""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(source, 'r', encoding='utf-8') as f:
             return f.read()
     except UnicodeDecodeError:
-        print(f"❌ Unicode decode error in {file_path}, trying fallback encoding...")
+        print(f"❌ Unicode decode error in {source}, trying fallback encoding...")
         try:
-            with open(file_path, 'r', encoding='latin-1') as f:
+            with open(source, 'r', encoding='latin-1') as f:
                 return f.read()
         except Exception as e:
-            print(f"❌ Fallback decoding failed for {file_path}: {e}")
+            print(f"❌ Fallback decoding failed for {source}: {e}")
             return ""
     except Exception as e:
-        print(f"❌ Error reading .txt file {file_path}: {e}")
+        print(f"❌ Error reading .txt file {source}: {e}")
         return ""
 
-def load_pdf(file_path: str) -> str:
-    """Load text from a PDF file using PyMuPDF."""
-    if not os.path.exists(file_path):
-        print(f"❌ File not found: {file_path}")
+def extract_pdf_pages(data: bytes, start: int, stop: int, max_chars: int = 0) -> Tuple[List[str], List[float]]:
+    """
+    Extracts pages [start, stop) of an in-memory PDF, stopping early once
+    `max_chars` characters have been collected. Returns (page texts, per-page ms).
+    Module-level so page ranges can run in a ProcessPoolExecutor worker.
+    """
+    parts, timings = [], []
+    collected = 0
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        for number in range(start, stop):
+            page_start = time.perf_counter()
+            try:
+                page_text = doc.load_page(number).get_text()
+            except Exception as e:
+                print(f"⚠️ Skipping unreadable PDF page {number + 1}: {e}")
+                page_text = ""
+            timings.append(round((time.perf_counter() - page_start) * 1000, 2))
+            parts.append(page_text)
+            collected += len(page_text)
+            if max_chars and collected >= max_chars:
+                break
+    return parts, timings
+
+def disable_pdf_pool():
+    """
+    Process pool initializer: workers of the upload and folder-ingestion pools
+    extract PDF pages sequentially instead of starting a nested page pool.
+    """
+    global _pdf_pool_disabled
+    _pdf_pool_disabled = True
+
+def _get_pdf_pool() -> Optional[ProcessPoolExecutor]:
+    global _pdf_pool
+    if PDF_WORKERS < 2 or _pdf_pool_disabled:
+        return None
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            # A multiprocessing finalizer also runs in child processes (uvicorn --reload/--workers),
+            # which skip atexit and would otherwise wait forever on the pool's workers. It must
+            # run before the pool's own queue finalizers (priority 10) or the stop signal is lost.
+            multiprocessing.util.Finalize(None, shutdown_pdf_pool, exitpriority=100)
+        return _pdf_pool
+
+def shutdown_pdf_pool():
+    """Stops the page-parallel PDF pool, if one was started; it is recreated on next use."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        # Waiting lets workers that are still starting up exit cleanly instead of hanging the join at exit
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def extract_pdf(source: Source, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> Dict:
+    """
+    Extracts text from a PDF within a page/character budget.
+
+    Long documents are split into page ranges extracted in parallel worker
+    processes; page texts are joined once at the end. Returns the text plus
+    an extraction report (pages read, truncation, per-page timings).
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    start = time.perf_counter()
+
+    if _is_path(source):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = _read_bytes(source)
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        page_count = doc.page_count
+    limit = min(page_count, max_pages) if max_pages else page_count
+
+    pool = _get_pdf_pool() if limit >= PDF_PARALLEL_MIN_PAGES else None
+    parts, timings = [], []
+    if pool is None:
+        parts, timings = extract_pdf_pages(data, 0, limit, max_chars)
+    else:
+        # Small ranges let a character budget stop early; otherwise one range per worker
+        step = PDF_PAGES_PER_TASK if max_chars else -(-limit // PDF_WORKERS)
+        futures = [
+            pool.submit(extract_pdf_pages, data, first, min(first + step, limit), max_chars)
+            for first in range(0, limit, step)
+        ]
+        collected = 0
+        for i, future in enumerate(futures):
+            range_parts, range_timings = future.result()
+            parts.extend(range_parts)
+            timings.extend(range_timings)
+            collected += sum(len(p) for p in range_parts)
+            if max_chars and collected >= max_chars:
+                for pending in futures[i + 1:]:
+                    pending.cancel()
+                break
+
+    # Form feeds mark page boundaries (compaction uses them to spot page numbers)
+    text = "\f".join(parts)
+    truncated = len(parts) < page_count or bool(max_chars and len(text) > max_chars)
+    if max_chars:
+        text = text[:max_chars]
+
+    report = {
+        "page_count": page_count,
+        "pages_extracted": len(parts),
+        "truncated": truncated,
+        "parallel": pool is not None,
+        "page_timings_ms": timings,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    return {"text": text, "report": report}
+
+def load_pdf(source: Source, report_out: Optional[Dict] = None) -> str:
+    """
+    Load text from a PDF file (path, bytes or stream) using PyMuPDF.
+    If `report_out` is given it is filled with the extraction report.
+    """
+    if _is_path(source) and not os.path.exists(source):
+        print(f"❌ File not found: {source}")
         return ""
     try:
-        text = ""
-        with fitz.open(file_path) as doc:
-            for i, page in enumerate(doc):
-                page_text = page.get_text()
-                if page_text:
-                    text += page_text
-        return text
+        result = extract_pdf(source)
+        report = result["report"]
+        if report_out is not None:
+            report_out.update(report)
+        if report["truncated"] or report["parallel"]:
+            slowest = max(range(len(report["page_timings_ms"])), key=report["page_timings_ms"].__getitem__, default=None)
+            print(
+                f"📄 Extracted {report['pages_extracted']}/{report['page_count']} pages in {report['took_ms']} ms"
+                + (f" (slowest: page {slowest + 1}, {report['page_timings_ms'][slowest]} ms)" if slowest is not None else "")
+                + (" — truncated by budget" if report["truncated"] else "")
+            )
+        return result["text"]
     except Exception as e:
-        print(f"❌ Error reading .pdf file {file_path}: {e}")
+        print(f"❌ Error reading .pdf file {_describe(source)}: {e}")
         return ""
 
-def load_docx(file_path: str) -> str:
-    """Load text from a Microsoft Word .docx file."""
-    if not os.path.exists(file_path):
-        print(f"❌ File not found: {file_path}")
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+def iter_docx_blocks(stream: BinaryIO):
+    """
+    Streams the text blocks of a .docx body in document order.
+
+    Iterparses `word/document.xml` straight from the zip and yields one string
+    per paragraph, and one `cell | cell | ...` line per table row. Elements are
+    cleared as soon as they are consumed, so memory stays bounded by the
+    largest paragraph or table row rather than the whole document.
+    """
+    with zipfile.ZipFile(stream) as archive, archive.open("word/document.xml") as xml:
+        paragraphs: List[List[str]] = []   # open paragraphs (text boxes nest inside runs)
+        rows: List[List[str]] = []         # open table rows (tables can nest)
+        cells: List[List[str]] = []        # open table cells
+        fallback_depth = 0                 # mc:Fallback repeats mc:Choice content
+        body = None
+
+        for event, elem in ET.iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == _MC_FALLBACK:
+                    fallback_depth += 1
+                elif fallback_depth:
+                    continue
+                elif tag == _W + "p":
+                    paragraphs.append([])
+                elif tag == _W + "tr":
+                    rows.append([])
+                elif tag == _W + "tc":
+                    cells.append([])
+                elif tag == _W + "body":
+                    body = elem
+                continue
+
+            if tag == _MC_FALLBACK:
+                fallback_depth -= 1
+            elif fallback_depth:
+                pass
+            elif tag == _W + "t":
+                if paragraphs and elem.text:
+                    paragraphs[-1].append(elem.text)
+            elif tag == _W + "tab":
+                if paragraphs:
+                    paragraphs[-1].append("\t")
+            elif tag in (_W + "br", _W + "cr"):
+                if paragraphs:
+                    paragraphs[-1].append("\n")
+            elif tag == _W + "p":
+                text = "".join(paragraphs.pop())
+                if text.strip():
+                    if cells:
+                        cells[-1].append(text.strip())
+                    else:
+                        yield text
+            elif tag == _W + "tc":
+                rows[-1].append(" ".join(cells.pop()))
+            elif tag == _W + "tr":
+                row = [cell for cell in rows.pop() if cell]
+                if row:
+                    line = " | ".join(row)
+                    if cells:
+                        cells[-1].append(line)
+                    else:
+                        yield line
+
+            # Drop consumed top-level blocks from the tree
+            if body is not None and not paragraphs and not rows and tag in (_W + "p", _W + "tbl", _W + "sdt"):
+                body.clear()
+
+def load_docx(source: Source) -> str:
+    """Load text (paragraphs and table rows) from a Microsoft Word .docx file (path, bytes or stream)."""
+    if _is_path(source) and not os.path.exists(source):
+        print(f"❌ File not found: {source}")
         return ""
     try:
-        doc = Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        if _is_path(source):
+            with open(source, "rb") as f:
+                return "\n".join(iter_docx_blocks(f))
+        return "\n".join(iter_docx_blocks(source))
     except Exception as e:
-        print(f"❌ Error reading .docx file {file_path}: {e}")
+        print(f"❌ Error reading .docx file {_describe(source)}: {e}")
         return ""
 
-def load_document(file_path: str) -> str:
-    """Dispatches to the appropriate file loader based on extension."""
-    ext = os.path.splitext(file_path)[1].lower()
-    print(f"📂 Loading file: {file_path}")
-    
+def load_document(source: Source, filename: Optional[str] = None) -> str:
+    """
+    Dispatches to the appropriate file loader based on extension.
+
+    `source` may be a path, or bytes / a binary stream together with the
+    original `filename` (used only to pick the loader). Extracted text is
+    cached by file content hash, so unchanged files are never parsed twice.
+    """
+    return _load(source, filename, with_sections=False)["content"]
+
+def load_document_with_sections(source: Source, filename: Optional[str] = None) -> Dict:
+    """
+    Like load_document, but also splits the text into labeled resume sections
+    (skills, experience, education, ...). PDF headings are confirmed from
+    PyMuPDF layout (bold / larger fonts). Returns {"content", "sections",
+    "report"}, where "report" is the PDF extraction report (None otherwise).
+    """
+    return _load(source, filename, with_sections=True)
+
+def _cached(cache: Optional[ExtractionCache], key: str, compute, name: str) -> str:
+    if cache is not None:
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            print(f"⚠️ Extraction cache lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            print(f"⚡ Extraction cache hit: {name}")
+            return cached
+
+    value = compute()
+    if cache is not None and value:
+        try:
+            cache.put(key, value)
+        except Exception as e:
+            print(f"⚠️ Extraction cache write failed: {e}")
+    return value
+
+def _segment(data: bytes, ext: str, text: str) -> Dict[str, str]:
+    layout_headings = None
+    if ext == ".pdf":
+        try:
+            with fitz.open(stream=data, filetype="pdf") as doc:
+                layout_headings = pdf_layout_headings(doc)
+        except Exception as e:
+            print(f"⚠️ PDF layout analysis failed, using text heuristics only: {e}")
+    return segment_text(text, layout_headings)
+
+def _load(source: Source, filename: Optional[str], with_sections: bool) -> Dict:
+    name = filename or (str(source) if _is_path(source) else "")
+    ext = os.path.splitext(name)[1].lower()
+    print(f"📂 Loading file: {name}")
+
+    if ext not in SUPPORTED_EXTENSIONS:
+        print(f"⚠️ Unsupported file format: {name}")
+        return {"content": "", "sections": {}}
+
+    try:
+        if _is_path(source):
+            with open(source, "rb") as f:
+                data = f.read()
+        else:
+            data = _read_bytes(source)
+    except FileNotFoundError:
+        print(f"❌ File not found: {source}")
+        return {"content": "", "sections": {}}
+
+    cache = get_extraction_cache()
+    digest = file_hash(data) if cache is not None else ""
+    # PDF extraction report (pages, truncation, per-page timings); stays empty on a cache hit
+    report: Dict = {}
+    text = _cached(cache, make_extraction_key(digest, ext, loader_signature()),
+                   lambda: _parse_document(data, ext, name, report), name)
+    if not with_sections or not text:
+        return {"content": text, "sections": {}, "report": report or None}
+
+    sections = _cached(cache, make_extraction_key(digest, ext + "+sections", loader_signature()),
+                       lambda: json.dumps(_segment(data, ext, text)), name)
+    return {"content": text, "sections": json.loads(sections), "report": report or None}
+
+def _parse_document(source: Source, ext: str, name: str, report_out: Optional[Dict] = None) -> str:
     if ext == ".txt":
-        return load_txt(file_path)
+        return load_txt(source)
     elif ext == ".pdf":
-        return load_pdf(file_path)
+        return load_pdf(source, report_out)
     elif ext == ".docx":
-        return load_docx(file_path)
+        return load_docx(source)
     else:
-        print(f"⚠️ Unsupported file format: {file_path}")
+        print(f"⚠️ Unsupported file format: {name}")
         return ""
 
-def load_documents_from_folder(folder_path: str) -> dict:
-    """Load all supported documents from a given folder."""
-    supported_exts = {".txt", ".pdf", ".docx"}
+def extract_document(data: bytes, filename: str) -> Dict:
+    """
+    Extracts text and resume sections from an in-memory document and times
+    the extraction. Module-level so it can run in a ProcessPoolExecutor worker.
+    """
+    start = time.perf_counter()
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file format: {ext or filename}")
+    result = load_document_with_sections(data, filename)
+    if not result["content"]:
+        raise ValueError("No readable content")
+    return {
+        "content": result["content"],
+        "sections": result["sections"],
+        "pdf_report": result.get("report"),
+        "extraction_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+def load_documents_from_folder(folder_path: str, incremental: bool = False) -> dict:
+    """
+    Load all supported documents from a given folder.
+
+    With `incremental=True` a manifest of the folder is kept between calls and
+    only new or changed files are parsed (see folder_ingestion.FolderIngestor).
+    """
+    if incremental:
+        from .folder_ingestion import get_folder_ingestor
+        ingestor = get_folder_ingestor(folder_path)
+        ingestor.refresh()
+        return ingestor.documents()
+
+    supported_exts = SUPPORTED_EXTENSIONS
     documents = {}
 
     if not os.path.isdir(folder_path):
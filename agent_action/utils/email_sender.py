@@ -72,13 +72,13 @@ load_dotenv()
 
 def send_email(recipient_email: str, subject: str, body: str, attachments: List[Dict] = None) -> bool:
     """
-    Sends an email using SMTP, optionally with base64 PDF attachments.
+    Sends an email using SMTP, optionally with PDF attachments.
     
     Args:
         recipient_email: Email address of the recipient
         subject: Email subject
         body: Email body content
-        attachments: Optional list of dicts with 'filename' and 'data' (base64-encoded)
+        attachments: Optional list of dicts with 'filename' and 'data' (raw bytes or base64 string)
         
     Returns:
         bool: True if email sent successfully, False otherwise
@@ -106,7 +106,8 @@ def send_email(recipient_email: str, subject: str, body: str, attachments: List[
         if attachments:
             for attachment in attachments:
                 part = MIMEBase("application", "octet-stream")
-                part.set_payload(base64.b64decode(attachment["data"]))
+                data = attachment["data"]
+                part.set_payload(data if isinstance(data, (bytes, bytearray)) else base64.b64decode(data))
                 encoders.encode_base64(part)
                 part.add_header(
                     "Content-Disposition",
@@ -0,0 +1,118 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+
+def file_hash(data: bytes) -> str:
+    """SHA-256 hex digest of a file's raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_extraction_key(digest: str, extension: str, loader_version: str) -> str:
+    """Cache key for one file's extracted text under a given loader version."""
+    return f"{digest}:{extension}:{loader_version}"
+
+
+class ExtractionCache:
+    """
+    Persistent cache of extracted document text, backed by a local SQLite file.
+
+    Entries are keyed by the SHA-256 of the file bytes plus the loader version,
+    so re-uploads and folder reloads skip PDF/DOCX parsing entirely. The total
+    size of cached text is bounded by `max_bytes`; least recently used entries
+    are evicted first. Hit/miss counters are stored alongside the entries so
+    they are shared by every process using the same database (e.g. the
+    /process-uploads worker pool).
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.db_path = db_path or os.getenv("EXTRACTION_CACHE_DB", "agent_action/data/extraction_cache.sqlite3")
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv("EXTRACTION_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS extractions (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_last_access ON extractions (last_access)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+                [("hits",), ("misses",), ("evictions",)]
+            )
+
+    def _bump(self, name: str, amount: int = 1):
+        self._conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT text FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._bump("misses")
+                return None
+            self._conn.execute("UPDATE extractions SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._bump("hits")
+            return row[0]
+
+    def put(self, key: str, text: str):
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, text, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, text, size, time.time())
+            )
+            self._evict_locked()
+
+    def _evict_locked(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% of the budget so we do not evict on every insert
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM extractions ORDER BY last_access"):
+            if freed >= target:
+                break
+            evicted.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM extractions WHERE key = ?", evicted)
+        self._bump("evictions", len(evicted))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions").fetchone()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "evictions": counters["evictions"],
+            "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM extractions")
+            self._conn.execute("UPDATE counters SET value = 0")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
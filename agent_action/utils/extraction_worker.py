@@ -0,0 +1,140 @@
+import os
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+# Workers unpickle tasks by importing this module; keep its imports to the loader only
+from .document_loader import extract_document, disable_pdf_pool
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def extract(data: bytes, filename: str) -> Dict:
+    """Pool task: extracts one uploaded document (see `extract_document`)."""
+    return extract_document(data, filename)
+
+
+def create_extraction_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool for CPU-bound document extraction.
+
+    Uses "spawn" so workers do not inherit a process that already runs Mongo
+    clients and watcher threads. Spawned workers re-import the launching
+    script as `__mp_main__`, so the server must be launched through a module
+    whose import is cheap (the uvicorn CLI), never by running server.py's
+    app setup as the main script.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=disable_pdf_pool
+    )
+
+
+def warm_up(pool: ProcessPoolExecutor, workers: int, timeout: float = 60.0) -> int:
+    """Starts every worker up front so the first upload does not pay for process start-up."""
+    done, _ = wait([pool.submit(_ready) for _ in range(workers)], timeout=timeout)
+    return len({future.result() for future in done if future.exception() is None})
+
+
+def _terminate(pool: ProcessPoolExecutor):
+    """Stops a pool without waiting; ProcessPoolExecutor has no public way to stop a running task."""
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        try:
+            process.terminate()
+        except Exception:
+            pass
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ExtractionPool:
+    """
+    Self-healing wrapper around the extraction process pool.
+
+    A worker that dies (segfault or OOM on a malformed file) breaks a
+    ProcessPoolExecutor for good, so the pool is replaced and every file that
+    was in flight is retried once, alone in a single-worker pool, so the file
+    that caused the crash cannot break the shared pool a second time. A task
+    that exceeds `timeout` cannot be cancelled inside its worker either; the
+    pool is recycled (old workers terminated) so hung parses do not pile up.
+    """
+
+    def __init__(self, workers: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._generation = 0
+        # One task per worker at a time, so `timeout` measures parsing rather than queueing
+        self._slots = asyncio.Semaphore(workers)
+        self.rebuilds = 0
+        self.timeouts = 0
+        self.crashes = 0
+
+    def _current(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = create_extraction_pool(self.workers)
+            return self._pool, self._generation
+
+    def _recycle(self, generation: int, reason: str):
+        with self._lock:
+            # Another file already replaced this pool
+            if generation != self._generation or self._pool is None:
+                return
+            old = self._pool
+            self._pool = create_extraction_pool(self.workers)
+            self._generation += 1
+            self.rebuilds += 1
+        print(f"♻️ Recycling extraction pool ({reason})")
+        _terminate(old)
+        threading.Thread(target=self.warm_up, name="extraction-warm-up", daemon=True).start()
+
+    async def _run(self, pool: ProcessPoolExecutor, data: bytes, filename: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            return await asyncio.wait_for(loop.run_in_executor(pool, extract, data, filename), timeout=self.timeout)
+
+    async def extract(self, data: bytes, filename: str) -> Dict:
+        """Extracts one document in a worker; raises asyncio.TimeoutError or BrokenProcessPool."""
+        pool, generation = self._current()
+        try:
+            return await self._run(pool, data, filename)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._recycle(generation, f"{filename} timed out after {self.timeout:g}s")
+            raise
+        except BrokenProcessPool:
+            self.crashes += 1
+            self._recycle(generation, f"a worker died while extracting {filename}")
+
+        isolated = create_extraction_pool(1)
+        try:
+            return await self._run(isolated, data, filename)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            _terminate(isolated)
+
+    def warm_up(self) -> int:
+        pool, _ = self._current()
+        return warm_up(pool, self.workers)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "timeout_seconds": self.timeout,
+            "rebuilds": self.rebuilds,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+        }
@@ -0,0 +1,224 @@
+import os
+import time
+import sqlite3
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .document_loader import SUPPORTED_EXTENSIONS, disable_pdf_pool, load_document, loader_signature
+from .extraction_cache import file_hash
+
+
+def ingest_file(path: str) -> Tuple[str, str]:
+    """Hashes and extracts one file. Module-level so it can run in a worker process."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return file_hash(data), load_document(data, os.path.basename(path))
+
+
+class FolderIngestor:
+    """
+    Incremental loader for a folder of JD or profile documents.
+
+    A manifest of (filename, size, mtime, hash, text) is kept in a local SQLite
+    database. `refresh()` only stats the folder, re-parses new or changed files
+    (in parallel once there are enough of them) and drops deleted ones, so a
+    reload costs about as much as the diff rather than the whole corpus. A file
+    whose size is unchanged but whose mtime moved is hashed first and only
+    re-parsed if its contents differ from the manifest.
+    """
+
+    def __init__(self, folder_path: str, manifest_db: Optional[str] = None, workers: Optional[int] = None,
+                 parallel_threshold: Optional[int] = None):
+        self.folder_path = os.path.abspath(folder_path)
+        self.manifest_db = manifest_db or os.getenv("FOLDER_MANIFEST_DB", "agent_action/data/folder_manifest.sqlite3")
+        self.workers = workers or int(os.getenv("FOLDER_INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.parallel_threshold = parallel_threshold or int(os.getenv("FOLDER_INGEST_PARALLEL_MIN_FILES", "8"))
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        if os.path.dirname(self.manifest_db):
+            os.makedirs(os.path.dirname(self.manifest_db), exist_ok=True)
+        self._conn = sqlite3.connect(self.manifest_db, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS manifest (
+                    folder TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    hash TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    loader_version TEXT NOT NULL,
+                    PRIMARY KEY (folder, filename)
+                )
+            """)
+
+        # filename -> {"size", "mtime_ns", "hash", "content"}; rows written by an
+        # older loader version (or PDF budget) are ignored so those files are re-parsed
+        self.entries: Dict[str, Dict] = {
+            filename: {"size": size, "mtime_ns": mtime_ns, "hash": digest, "content": content}
+            for filename, size, mtime_ns, digest, content in self._conn.execute(
+                "SELECT filename, size, mtime_ns, hash, content FROM manifest WHERE folder = ? AND loader_version = ?",
+                (self.folder_path, loader_signature())
+            )
+        }
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        listing = {}
+        with os.scandir(self.folder_path) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                if os.path.splitext(entry.name)[1].lower() not in SUPPORTED_EXTENSIONS:
+                    continue
+                listing[entry.name] = entry.stat()
+        return listing
+
+    def _parse(self, filenames: List[str]) -> Dict[str, Tuple[str, str]]:
+        paths = [os.path.join(self.folder_path, name) for name in filenames]
+        parsed = {}
+        if len(paths) < self.parallel_threshold:
+            for name, path in zip(filenames, paths):
+                try:
+                    parsed[name] = ingest_file(path)
+                except Exception as e:
+                    print(f"❌ Failed to ingest {name}: {e}")
+            return parsed
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=disable_pdf_pool
+            )
+        futures = {name: self._pool.submit(ingest_file, path) for name, path in zip(filenames, paths)}
+        for name, future in futures.items():
+            try:
+                parsed[name] = future.result()
+            except Exception as e:
+                print(f"❌ Failed to ingest {name}: {e}")
+        return parsed
+
+    def _unchanged(self, name: str, digest: str) -> bool:
+        try:
+            with open(os.path.join(self.folder_path, name), "rb") as f:
+                return file_hash(f.read()) == digest
+        except OSError:
+            return False
+
+    def refresh(self) -> Dict:
+        """Brings the manifest in line with the folder and returns a change summary."""
+        start = time.perf_counter()
+        if not os.path.isdir(self.folder_path):
+            print(f"❌ Directory not found: {self.folder_path}")
+            return {"files": 0, "added": 0, "updated": 0, "removed": 0, "touched": 0, "failed": 0, "took_ms": 0.0}
+
+        with self._lock:
+            listing = self._scan()
+            removed = [name for name in self.entries if name not in listing]
+            changed, touched = [], []
+            for name, st in listing.items():
+                entry = self.entries.get(name)
+                if entry is None or entry["size"] != st.st_size:
+                    changed.append(name)
+                elif entry["mtime_ns"] != st.st_mtime_ns:
+                    # Same size, new mtime (copy, checkout, touch): only re-parse if the bytes differ
+                    if self._unchanged(name, entry["hash"]):
+                        touched.append(name)
+                    else:
+                        changed.append(name)
+
+            parsed = self._parse(changed) if changed else {}
+            added = sum(1 for name in parsed if name not in self.entries)
+
+            for name in touched:
+                self.entries[name]["mtime_ns"] = listing[name].st_mtime_ns
+            if touched:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE manifest SET mtime_ns = ? WHERE folder = ? AND filename = ?",
+                        [(listing[name].st_mtime_ns, self.folder_path, name) for name in touched]
+                    )
+
+            upserts = []
+            for name, (digest, content) in parsed.items():
+                st = listing[name]
+                self.entries[name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest, "content": content}
+                upserts.append((self.folder_path, name, st.st_size, st.st_mtime_ns, digest, content, loader_signature()))
+            for name in removed:
+                del self.entries[name]
+
+            if upserts or removed:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO manifest (folder, filename, size, mtime_ns, hash, content, loader_version) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        upserts
+                    )
+                    self._conn.executemany(
+                        "DELETE FROM manifest WHERE folder = ? AND filename = ?",
+                        [(self.folder_path, name) for name in removed]
+                    )
+
+        summary = {
+            "files": len(listing),
+            "added": added,
+            "updated": len(parsed) - added,
+            "removed": len(removed),
+            "touched": len(touched),
+            "failed": len(changed) - len(parsed),
+            "took_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        if changed or removed:
+            print(f"📁 Folder ingestion {self.folder_path}: {summary}")
+        return summary
+
+    def documents(self) -> Dict[str, str]:
+        """Filename → extracted text for every readable document in the folder."""
+        with self._lock:
+            return {name: entry["content"] for name, entry in self.entries.items() if entry["content"]}
+
+    def start_watching(self, interval: Optional[float] = None, on_change: Optional[Callable[[Dict], None]] = None):
+        """Re-runs refresh() every `interval` seconds in a background thread."""
+        interval = interval or float(os.getenv("FOLDER_WATCH_SECONDS", "30"))
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    summary = self.refresh()
+                    if on_change and (summary["added"] or summary["updated"] or summary["removed"]):
+                        on_change(summary)
+                except Exception as e:
+                    print(f"⚠️ Folder ingestion failed for {self.folder_path}: {e}")
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=run, name="folder-ingestion-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def close(self):
+        self.stop_watching()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        with self._lock:
+            self._conn.close()
+
+
+_ingestors: Dict[str, FolderIngestor] = {}
+_ingestors_lock = threading.Lock()
+
+
+def get_folder_ingestor(folder_path: str) -> FolderIngestor:
+    """Process-wide FolderIngestor for a folder, created on first use."""
+    key = os.path.abspath(folder_path)
+    with _ingestors_lock:
+        if key not in _ingestors:
+            _ingestors[key] = FolderIngestor(key)
+        return _ingestors[key]
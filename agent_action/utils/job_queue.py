@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+TERMINAL_STATES = {COMPLETED, FAILED}
+
+
+class JobQueue:
+    """
+    Persistent job queue backed by a local SQLite database.
+
+    Jobs move queued → running → completed/failed. A running job records the
+    worker that claimed it and a heartbeat that worker keeps refreshing; jobs
+    whose heartbeat is older than `heartbeat_timeout` seconds were orphaned by
+    a crash or restart and are put back on the queue (up to `max_attempts`
+    tries), so work is never silently dropped. Several server processes can
+    share one queue file without taking over each other's live jobs.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_attempts: Optional[int] = None,
+                 heartbeat_timeout: Optional[float] = None):
+        self.db_path = db_path or os.getenv("JOB_QUEUE_DB", "agent_action/data/jobs.sqlite3")
+        self.max_attempts = max_attempts or int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.heartbeat_timeout = heartbeat_timeout or float(os.getenv("JOB_HEARTBEAT_TIMEOUT_SECONDS", "60"))
+
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    progress_done INTEGER NOT NULL DEFAULT 0,
+                    progress_total INTEGER NOT NULL DEFAULT 0,
+                    progress_skipped INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    heartbeat_at REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)")
+            # Side effects (emails, stored sessions) already performed per job, so retries skip them
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_steps (
+                    job_id TEXT NOT NULL,
+                    step TEXT NOT NULL,
+                    done_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, step)
+                )
+            """)
+            # Queues created before these columns existed
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in (
+                ("progress_skipped", "INTEGER NOT NULL DEFAULT 0"),
+                ("worker_id", "TEXT"),
+                ("heartbeat_at", "REAL"),
+            ):
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row, include_payload: bool = False) -> Dict:
+        job = {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "progress": {"done": row["progress_done"], "total": row["progress_total"], "skipped": row["progress_skipped"]},
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "worker_id": row["worker_id"],
+            "heartbeat_at": row["heartbeat_at"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if include_payload:
+            job["payload"] = json.loads(row["payload"])
+        return job
+
+    def submit(self, kind: str, payload: Dict, total: int = 0) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, kind, status, payload, progress_total, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, QUEUED, json.dumps(payload), total, now, now)
+        )
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """Atomically marks the oldest queued job as running by `worker_id` and returns it."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            # Another process sharing the file may have claimed it since the SELECT
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, worker_id = ?, heartbeat_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, worker_id, now, now, row["id"], QUEUED)
+            )
+            if cursor.rowcount == 0:
+                return None
+            job = self._row_to_job(row, include_payload=True)
+        job.update(status=RUNNING, attempts=job["attempts"] + 1, worker_id=worker_id, heartbeat_at=now)
+        return job
+
+    def heartbeat(self, worker_id: str) -> int:
+        """Refreshes the heartbeat of every job `worker_id` is running."""
+        cursor = self._execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE status = ? AND worker_id = ?",
+            (time.time(), RUNNING, worker_id)
+        )
+        return cursor.rowcount
+
+    def release(self, worker_id: str) -> int:
+        """Puts the jobs `worker_id` is running back on the queue (graceful shutdown)."""
+        cursor = self._execute(
+            "UPDATE jobs SET status = ?, worker_id = NULL, heartbeat_at = NULL, updated_at = ? WHERE status = ? AND worker_id = ?",
+            (QUEUED, time.time(), RUNNING, worker_id)
+        )
+        return cursor.rowcount
+
+    def claim_step(self, job_id: str, step: str) -> bool:
+        """
+        Records a side effect of a job; returns False when it was already
+        recorded by an earlier attempt, in which case it must not be repeated.
+        """
+        cursor = self._execute(
+            "INSERT OR IGNORE INTO job_steps (job_id, step, done_at) VALUES (?, ?, ?)",
+            (job_id, step, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def update_progress(self, job_id: str, done: int, total: int, skipped: int = 0):
+        self._execute(
+            "UPDATE jobs SET progress_done = ?, progress_total = ?, progress_skipped = ?, updated_at = ? WHERE id = ?",
+            (done, total, skipped, time.time(), job_id)
+        )
+
+    def complete(self, job_id: str, result: Dict):
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE id = ?",
+            (COMPLETED, json.dumps(result, default=str), time.time(), job_id)
+        )
+
+    def fail(self, job_id: str, error: str):
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (FAILED, error, time.time(), job_id)
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def recover(self) -> int:
+        """
+        Requeues running jobs whose heartbeat expired (their worker crashed or
+        was killed); fails those out of attempts. Jobs with a live heartbeat
+        belong to another worker and are left alone.
+        """
+        now = time.time()
+        # Rows from before heartbeats existed fall back to their last update
+        expired = "status = ? AND COALESCE(heartbeat_at, updated_at) < ?"
+        cutoff = now - self.heartbeat_timeout
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE {expired} AND attempts >= ?",
+                (FAILED, "Interrupted too many times", now, RUNNING, cutoff, self.max_attempts)
+            )
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET status = ?, worker_id = NULL, heartbeat_at = NULL, updated_at = ? WHERE {expired}",
+                (QUEUED, now, RUNNING, cutoff)
+            )
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+ProgressCallback = Callable[..., Awaitable[None]]
+OnceCallback = Callable[[str], Awaitable[bool]]
+JobHandler = Callable[[Dict, ProgressCallback, OnceCallback], Awaitable[Dict]]
+
+
+class JobWorkerPool:
+    """
+    In-process asyncio workers that drain a JobQueue.
+
+    `handler(payload, progress, once)` runs each job and returns its
+    JSON-serializable result; `await progress(done, total, skipped=0)` persists
+    progress for polling clients without blocking the event loop, and
+    `await once(step)` is True only the first time a side effect is reached
+    for the job, across retries and processes.
+
+    Every pool has its own worker id. A background task refreshes the
+    heartbeat of the jobs it runs and requeues jobs of workers that stopped
+    heartbeating, so a crashed process's jobs resume without a restart.
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, JobHandler], workers: Optional[int] = None,
+                 heartbeat_interval: Optional[float] = None):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "2"))
+        self.heartbeat_interval = heartbeat_interval or float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    def notify(self):
+        """Wakes idle workers after a job is submitted."""
+        self._wakeup.set()
+
+    def _recover(self) -> int:
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"♻️ Requeued {recovered} interrupted job(s)")
+            self._wakeup.set()
+        return recovered
+
+    def start(self):
+        self._recover()
+        self._tasks = [asyncio.create_task(self._work(i)) for i in range(self.workers)]
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        tasks = self._tasks + ([self._heartbeat_task] if self._heartbeat_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._heartbeat_task = None
+        # Cancelled jobs go straight back on the queue; steps they already performed are not repeated
+        released = await asyncio.to_thread(self.queue.release, self.worker_id)
+        if released:
+            print(f"↩️ Released {released} unfinished job(s)")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await asyncio.to_thread(self.queue.heartbeat, self.worker_id)
+                await asyncio.to_thread(self._recover)
+            except Exception as e:
+                print(f"⚠️ Job heartbeat failed: {e}")
+
+    async def _work(self, worker_id: int):
+        while True:
+            job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=5.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id = job["job_id"]
+            print(f"🛠️ Worker {worker_id} running job {job_id} ({job['kind']})")
+
+            async def progress(done: int, total: int, skipped: int = 0):
+                # The sqlite write and commit run off the event loop
+                await asyncio.to_thread(self.queue.update_progress, job_id, done, total, skipped)
+
+            async def once(step: str) -> bool:
+                return await asyncio.to_thread(self.queue.claim_step, job_id, step)
+
+            try:
+                handler = self.handlers[job["kind"]]
+                result = await handler(job["payload"], progress, once)
+                await asyncio.to_thread(self.queue.complete, job_id, result)
+                print(f"✅ Job {job_id} completed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Job {job_id} failed: {e}")
+                await asyncio.to_thread(self.queue.fail, job_id, str(e))
+
+    def stats(self) -> Dict:
+        return {
+            "worker_id": self.worker_id,
+            "workers": self.workers,
+            "alive": sum(1 for t in self._tasks if not t.done()),
+            "jobs": self.queue.counts(),
+        }
@@ -0,0 +1,148 @@
+import os
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from .text_similarity import tokenize
+
+NUM_PERM = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+EMPTY_SIGNATURE = np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+
+
+def default_threshold() -> float:
+    return float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85"))
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """crc32 hashes of the distinct word `size`-grams of a text."""
+    tokens = tokenize(text)
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+    if len(tokens) < size:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """NUM_PERM-value MinHash signature of a text's word shingles."""
+    hashes = shingle_hashes(text)
+    if hashes.size == 0:
+        return EMPTY_SIGNATURE.copy()
+    permuted = ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=1)
+
+
+def estimated_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    if np.array_equal(a, EMPTY_SIGNATURE) or np.array_equal(b, EMPTY_SIGNATURE):
+        return 0.0
+    return float(np.mean(a == b))
+
+
+class MinHashLSH:
+    """
+    Banded locality-sensitive hashing over MinHash signatures.
+
+    Signatures are split into LSH_BANDS bands of LSH_ROWS values; documents that
+    share any band are candidates, which callers confirm with
+    `estimated_similarity`. With 32 bands of 4 rows, pairs above ~0.6 Jaccard
+    similarity are almost always found.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[tuple, Set[str]] = defaultdict(set)
+        self._keys: Dict[str, List[tuple]] = {}
+
+    @staticmethod
+    def _bands(signature: np.ndarray) -> List[tuple]:
+        return [(band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()) for band in range(LSH_BANDS)]
+
+    def insert(self, key: str, signature: np.ndarray):
+        self.remove(key)
+        if np.array_equal(signature, EMPTY_SIGNATURE):
+            return
+        bands = self._bands(signature)
+        self._keys[key] = bands
+        for band in bands:
+            self._buckets[band].add(key)
+
+    def remove(self, key: str):
+        for band in self._keys.pop(key, []):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def candidates(self, signature: np.ndarray) -> Set[str]:
+        found = set()
+        for band in self._bands(signature):
+            found |= self._buckets.get(band, set())
+        return found
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def find_duplicate_groups(documents: Dict[str, str], threshold: Optional[float] = None) -> List[List[str]]:
+    """
+    Groups near-duplicate documents (estimated Jaccard ≥ `threshold`).
+
+    Returns only groups with two or more members; each group lists names in
+    input order, so the first entry is the representative.
+    """
+    threshold = default_threshold() if threshold is None else threshold
+    names = list(documents)
+    order = {name: i for i, name in enumerate(names)}
+    signatures = {name: minhash_signature(documents[name]) for name in names}
+
+    parent = {name: name for name in names}
+
+    def root(name: str) -> str:
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    lsh = MinHashLSH()
+    for name in names:
+        for other in lsh.candidates(signatures[name]):
+            if estimated_similarity(signatures[name], signatures[other]) >= threshold:
+                a, b = root(name), root(other)
+                if a != b:
+                    # Keep the earliest document as the cluster root
+                    parent[max(a, b, key=order.get)] = min(a, b, key=order.get)
+        lsh.insert(name, signatures[name])
+
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for name in names:
+        groups[root(name)].append(name)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def expand_duplicate_results(results: Iterable[Dict], groups: List[List[str]]) -> List[Dict]:
+    """
+    Copies each representative's comparison result to the other members of its
+    duplicate group, marking the copies with `duplicate_of`.
+    """
+    members_of = {group[0]: group[1:] for group in groups}
+    expanded = []
+    for result in results:
+        expanded.append(result)
+        for member in members_of.get(result.get("profile_name"), []):
+            expanded.append({**result, "profile_name": member, "duplicate_of": result["profile_name"]})
+    return expanded
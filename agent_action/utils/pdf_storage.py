@@ -0,0 +1,158 @@
+import os
+import base64
+import time
+from typing import Dict, Iterator, Optional
+
+import gridfs
+from bson import Binary, ObjectId
+from pymongo import UpdateOne
+
+# `pdfFile.encoding` values; documents without one are legacy base64 strings
+ENCODING_BASE64 = "base64"
+ENCODING_BINARY = "binary"
+ENCODING_GRIDFS = "gridfs"
+
+GRIDFS_BUCKET = os.getenv("PDF_GRIDFS_BUCKET", "profilePdfs")
+# PDFs above this size go to GridFS instead of the profile document (BSON caps documents at 16 MB)
+GRIDFS_THRESHOLD_BYTES = int(float(os.getenv("PDF_GRIDFS_THRESHOLD_MB", "8")) * 1024 * 1024)
+STREAM_CHUNK_SIZE = int(os.getenv("PDF_STREAM_CHUNK_SIZE", str(256 * 1024)))
+
+
+class PdfStorage:
+    """
+    Stores profile PDFs as raw bytes instead of base64 strings.
+
+    Small files live in the profile document as BSON Binary
+    (`pdfFile.data`, `encoding: "binary"`); files over the GridFS threshold
+    are written to the GridFS bucket and referenced by `pdfFile.gridfsId`.
+    Reads accept all three layouts, including legacy base64 strings, so
+    documents can be migrated while the app is running.
+    """
+
+    def __init__(self, db, bucket_name: str = GRIDFS_BUCKET, gridfs_threshold: int = GRIDFS_THRESHOLD_BYTES):
+        self.db = db
+        self.bucket = gridfs.GridFSBucket(db, bucket_name=bucket_name)
+        self.gridfs_threshold = gridfs_threshold
+
+    def encode(self, data: bytes, mime_type: str = "application/pdf", filename: str = "resume.pdf") -> Dict:
+        """Builds the `pdfFile` subdocument for raw file bytes, uploading to GridFS when large."""
+        if len(data) > self.gridfs_threshold:
+            file_id = self.bucket.upload_from_stream(filename, data, metadata={"mimeType": mime_type})
+            return {"gridfsId": file_id, "mimeType": mime_type, "size": len(data), "encoding": ENCODING_GRIDFS}
+        return {"data": Binary(data), "mimeType": mime_type, "size": len(data), "encoding": ENCODING_BINARY}
+
+    def read(self, pdf_file: Optional[Dict]) -> Optional[bytes]:
+        """Raw bytes of a stored `pdfFile`, whatever its layout; None when there is no file."""
+        if not pdf_file:
+            return None
+        if pdf_file.get("gridfsId") is not None:
+            return self.bucket.open_download_stream(pdf_file["gridfsId"]).read()
+        data = pdf_file.get("data")
+        if not data:
+            return None
+        if isinstance(data, (bytes, bytearray)):
+            return bytes(data)
+        return base64.b64decode(data)
+
+    def iter_chunks(self, pdf_file: Optional[Dict], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yields a stored file in chunks; GridFS files are streamed without loading them whole."""
+        if pdf_file and pdf_file.get("gridfsId") is not None:
+            stream = self.bucket.open_download_stream(pdf_file["gridfsId"])
+            try:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+            finally:
+                stream.close()
+
+        data = self.read(pdf_file)
+        if data is None:
+            return
+        view = memoryview(data)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+
+    def migrate(self, collection, batch_size: int = 200, dry_run: bool = False, limit: Optional[int] = None) -> Dict:
+        """
+        Converts legacy base64 `pdfFile.data` strings to BSON Binary (or GridFS
+        for large files) with one `bulk_write` per batch.
+
+        Only documents whose data is still a string are touched, so the tool can
+        be re-run safely after an interruption. GridFS uploads happen before the
+        profile update; an upload whose update fails is deleted again.
+        """
+        start = time.perf_counter()
+        summary = {
+            "scanned": 0, "converted": 0, "gridfs": 0, "failed": 0,
+            "bytes_before": 0, "bytes_after": 0, "dry_run": dry_run,
+        }
+        query = {"pdfFile.data": {"$type": "string"}}
+        cursor = collection.find(query, {"name": 1, "pdfFile": 1}, batch_size=batch_size, no_cursor_timeout=True)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        operations, uploads = [], []
+        try:
+            for record in cursor:
+                summary["scanned"] += 1
+                pdf = record["pdfFile"]
+                try:
+                    data = base64.b64decode(pdf["data"], validate=True)
+                except Exception as e:
+                    summary["failed"] += 1
+                    print(f"⚠️ Skipping {record['_id']}: pdfFile.data is not valid base64 ({e})")
+                    continue
+
+                summary["bytes_before"] += len(pdf["data"])
+                summary["bytes_after"] += len(data)
+                large = len(data) > self.gridfs_threshold
+                summary["gridfs"] += int(large)
+                if dry_run:
+                    summary["converted"] += 1
+                    continue
+
+                name = (record.get("name") or "resume").replace(" ", "_")
+                encoded = self.encode(data, pdf.get("mimeType", "application/pdf"), f"{name}.pdf")
+                update = {"$set": {f"pdfFile.{key}": value for key, value in encoded.items()}}
+                if large:
+                    update["$unset"] = {"pdfFile.data": ""}
+                    uploads.append(encoded["gridfsId"])
+                else:
+                    uploads.append(None)
+                # Matching on the string type makes a concurrent re-run a no-op
+                operations.append(UpdateOne({"_id": record["_id"], **query}, update))
+
+                if len(operations) >= batch_size:
+                    self._apply(collection, operations, uploads, summary)
+                    operations, uploads = [], []
+
+            if operations:
+                self._apply(collection, operations, uploads, summary)
+        finally:
+            cursor.close()
+
+        summary["took_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return summary
+
+    def _apply(self, collection, operations, uploads, summary: Dict):
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            summary["converted"] += result.modified_count
+            failed = set()
+        except Exception as e:
+            details = getattr(e, "details", None) or {}
+            errors = details.get("writeErrors", [])
+            failed = {err["index"] for err in errors} if errors else set(range(len(operations)))
+            summary["converted"] += details.get("nModified", 0)
+            summary["failed"] += len(failed)
+            print(f"❌ Bulk update failed for {len(failed)} document(s): {e}")
+
+        # Drop GridFS uploads whose profile was not updated
+        for index, file_id in enumerate(uploads):
+            if file_id is not None and index in failed:
+                try:
+                    self.bucket.delete(ObjectId(file_id))
+                except Exception:
+                    pass
@@ -0,0 +1,360 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+from .score_cache import content_hash
+from .text_similarity import term_frequency_vector, inverse_document_frequency, l2_normalize
+from .near_duplicates import NUM_PERM, MinHashLSH, minhash_signature, estimated_similarity, default_threshold
+
+
+class ProfileIndex:
+    """
+    Persistent vector index over `consultantprofiles.resumeText`.
+
+    Each profile is stored as an L2-normalized hashed term-frequency row. Document
+    frequencies are maintained incrementally, and idf weighting is applied to the
+    query at search time, so inserts, edits and deletes never require a rebuild.
+    The index is persisted to `index_dir` after every batch of changes.
+
+    A MinHash signature is kept per profile as well, with an LSH index over
+    them, so near-duplicate resumes can be flagged at upload time.
+
+    Listeners registered with `add_listener` are told which profiles were
+    edited, replaced or deleted (including PDF-only changes), so caches keyed
+    by profile ID can drop stale entries.
+    """
+
+    def __init__(self, index_dir: Optional[str] = None, dim: Optional[int] = None):
+        self.index_dir = index_dir or os.getenv("PROFILE_INDEX_DIR", "agent_action/data/index")
+        self.dim = dim or int(os.getenv("PROFILE_INDEX_DIM", "4096"))
+
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[List[str]], None]] = []
+        # profile ID -> (pdfFile.size, gridfsId, encoding) seen by the last sync; in memory only
+        self._pdf_versions: Dict[str, Tuple] = {}
+
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.fingerprints: List[str] = []
+        self.text_lengths: List[int] = []
+        self._positions: Dict[str, int] = {}
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._signatures = np.zeros((0, NUM_PERM), dtype=np.uint64)
+        self._lsh = MinHashLSH()
+        self.document_frequency = np.zeros(self.dim, dtype=np.int64)
+
+        self.load()
+
+    # ---- persistence -------------------------------------------------------
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.index_dir, "profile_vectors.npz")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.index_dir, "profile_index.json")
+
+    def load(self):
+        """Loads a previously persisted index, if one exists for this dimension."""
+        if not (os.path.exists(self._vectors_path) and os.path.exists(self._meta_path)):
+            return
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("dim") != self.dim:
+                print(f"⚠️ Profile index dimension changed ({meta.get('dim')} → {self.dim}); rebuilding.")
+                return
+            arrays = np.load(self._vectors_path)
+            if "signatures" not in arrays:
+                print("⚠️ Profile index predates near-duplicate signatures; rebuilding.")
+                return
+            with self._lock:
+                self.ids = meta["ids"]
+                self.names = meta["names"]
+                self.fingerprints = meta["fingerprints"]
+                self.text_lengths = meta["text_lengths"]
+                self._positions = {pid: i for i, pid in enumerate(self.ids)}
+                self._vectors = arrays["vectors"]
+                self._signatures = arrays["signatures"]
+                self.document_frequency = arrays["document_frequency"]
+                for pos, pid in enumerate(self.ids):
+                    self._lsh.insert(pid, self._signatures[pos])
+            print(f"📚 Loaded profile index with {len(self.ids)} profiles")
+        except Exception as e:
+            print(f"❌ Failed to load profile index, starting empty: {e}")
+
+    def save(self):
+        """Atomically writes the index to `index_dir`."""
+        os.makedirs(self.index_dir, exist_ok=True)
+        with self._lock:
+            meta = {
+                "dim": self.dim,
+                "ids": self.ids,
+                "names": self.names,
+                "fingerprints": self.fingerprints,
+                "text_lengths": self.text_lengths,
+            }
+            vectors = self._vectors[:len(self.ids)].copy()
+            signatures = self._signatures[:len(self.ids)].copy()
+            document_frequency = self.document_frequency.copy()
+
+        tmp_vectors = self._vectors_path + ".tmp.npz"
+        tmp_meta = self._meta_path + ".tmp"
+        np.savez(tmp_vectors, vectors=vectors, signatures=signatures, document_frequency=document_frequency)
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_vectors, self._vectors_path)
+        os.replace(tmp_meta, self._meta_path)
+
+    # ---- incremental updates ----------------------------------------------
+
+    @staticmethod
+    def fingerprint(name: str, text: str) -> str:
+        return content_hash(f"{name}\x00{text}")
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._vectors.shape[0]:
+            return
+        capacity = max(rows, 2 * self._vectors.shape[0], 64)
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[:len(self.ids)] = self._vectors[:len(self.ids)]
+        self._vectors = grown
+        grown_signatures = np.zeros((capacity, NUM_PERM), dtype=np.uint64)
+        grown_signatures[:len(self.ids)] = self._signatures[:len(self.ids)]
+        self._signatures = grown_signatures
+
+    def _remove_locked(self, profile_id: str):
+        pos = self._positions.pop(profile_id)
+        self.document_frequency -= (self._vectors[pos] > 0)
+        self._lsh.remove(profile_id)
+        last = len(self.ids) - 1
+        if pos != last:
+            # Swap-remove: move the last row into the freed slot
+            self._vectors[pos] = self._vectors[last]
+            self._signatures[pos] = self._signatures[last]
+            self.ids[pos] = self.ids[last]
+            self.names[pos] = self.names[last]
+            self.fingerprints[pos] = self.fingerprints[last]
+            self.text_lengths[pos] = self.text_lengths[last]
+            self._positions[self.ids[pos]] = pos
+        self._vectors[last] = 0
+        self.ids.pop()
+        self.names.pop()
+        self.fingerprints.pop()
+        self.text_lengths.pop()
+
+    def add_listener(self, callback: Callable[[List[str]], None]):
+        """Registers `callback(profile_ids)`, called after profiles change or are removed."""
+        self._listeners.append(callback)
+
+    def _notify(self, profile_ids: List[str]):
+        if not profile_ids:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(profile_ids)
+            except Exception as e:
+                print(f"⚠️ Profile index listener failed: {e}")
+
+    def upsert_many(self, records: Iterable[Dict]) -> int:
+        """
+        Inserts or updates profiles. Each record needs `_id`, `name` and `resumeText`.
+        Returns the number of profiles whose vectors changed.
+        """
+        changed_ids = []
+        with self._lock:
+            for record in records:
+                profile_id = str(record["_id"])
+                name = record.get("name", "")
+                text = record.get("resumeText") or ""
+                fp = self.fingerprint(name, text)
+                text_length = len(text.encode("utf-8"))
+
+                pos = self._positions.get(profile_id)
+                if pos is not None and self.fingerprints[pos] == fp:
+                    continue
+
+                vector = l2_normalize(term_frequency_vector(text, self.dim))
+                if pos is None:
+                    pos = len(self.ids)
+                    self._ensure_capacity(pos + 1)
+                    self.ids.append(profile_id)
+                    self.names.append(name)
+                    self.fingerprints.append(fp)
+                    self.text_lengths.append(text_length)
+                    self._positions[profile_id] = pos
+                else:
+                    self.document_frequency -= (self._vectors[pos] > 0)
+                    self.names[pos] = name
+                    self.fingerprints[pos] = fp
+                    self.text_lengths[pos] = text_length
+
+                self._vectors[pos] = vector
+                self._signatures[pos] = minhash_signature(text)
+                self._lsh.insert(profile_id, self._signatures[pos])
+                self.document_frequency += (vector > 0)
+                changed_ids.append(profile_id)
+        self._notify(changed_ids)
+        return len(changed_ids)
+
+    def remove_many(self, profile_ids: Iterable[str]) -> int:
+        removed_ids = []
+        with self._lock:
+            for profile_id in profile_ids:
+                if str(profile_id) in self._positions:
+                    self._remove_locked(str(profile_id))
+                    removed_ids.append(str(profile_id))
+                self._pdf_versions.pop(str(profile_id), None)
+        self._notify(removed_ids)
+        return len(removed_ids)
+
+    # ---- Mongo synchronisation --------------------------------------------
+
+    def sync(self, collection, batch_size: Optional[int] = None) -> Dict:
+        """
+        Reconciles the index with the profile collection: new and edited profiles
+        are (re)vectorized and deleted ones dropped. Profiles are streamed in
+        batches and compared by content fingerprint, so an edit that keeps the
+        text length is still picked up; only changed profiles are re-vectorized.
+        """
+        start = time.perf_counter()
+        batch_size = batch_size or int(os.getenv("PROFILE_INDEX_SYNC_BATCH", "500"))
+        seen = set()
+        added = 0
+        batch = []
+        pdf_changed = []
+        projection = {"name": 1, "resumeText": 1, "pdfFile.size": 1, "pdfFile.gridfsId": 1, "pdfFile.encoding": 1}
+        for doc in collection.find({}, projection, batch_size=batch_size):
+            profile_id = str(doc["_id"])
+            seen.add(profile_id)
+            pdf = doc.get("pdfFile") or {}
+            version = (pdf.get("size"), str(pdf.get("gridfsId") or ""), pdf.get("encoding"))
+            previous = self._pdf_versions.get(profile_id)
+            if previous is not None and previous != version:
+                pdf_changed.append(profile_id)
+            self._pdf_versions[profile_id] = version
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                added += self.upsert_many(batch)
+                batch = []
+        if batch:
+            added += self.upsert_many(batch)
+
+        # A replaced PDF with unchanged text does not touch the index, but cached attachments are stale
+        self._notify(pdf_changed)
+
+        with self._lock:
+            stale = [pid for pid in self._positions if pid not in seen]
+        removed = self.remove_many(stale)
+
+        if added or removed:
+            self.save()
+
+        summary = {
+            "profiles": len(self.ids),
+            "updated": added,
+            "removed": removed,
+            "took_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        print(f"📚 Profile index sync: {summary}")
+        return summary
+
+    def apply_change(self, change: Dict):
+        """Applies one Mongo change-stream event to the index."""
+        operation = change.get("operationType")
+        if operation == "delete":
+            self.remove_many([str(change["documentKey"]["_id"])])
+        elif operation in ("insert", "update", "replace") and change.get("fullDocument"):
+            if not self.upsert_many([change["fullDocument"]]) and operation != "insert":
+                # Text unchanged, but the PDF may have been replaced
+                self._notify([str(change["documentKey"]["_id"])])
+        else:
+            return
+        self.save()
+
+    def start_watching(self, collection, poll_interval: Optional[float] = None):
+        """
+        Keeps the index up to date in a background thread. Uses a change stream
+        when the deployment supports one, otherwise re-syncs every `poll_interval` seconds.
+        """
+        poll_interval = poll_interval or float(os.getenv("PROFILE_INDEX_POLL_SECONDS", "60"))
+
+        def run():
+            try:
+                with collection.watch(full_document="updateLookup") as stream:
+                    print("👀 Watching consultantprofiles change stream")
+                    while not self._stop.is_set():
+                        change = stream.try_next()
+                        if change is None:
+                            self._stop.wait(1.0)
+                            continue
+                        self.apply_change(change)
+                    return
+            except PyMongoError as e:
+                print(f"ℹ️ Change streams unavailable ({e}); polling every {poll_interval}s")
+
+            while not self._stop.wait(poll_interval):
+                try:
+                    self.sync(collection)
+                except Exception as e:
+                    print(f"⚠️ Profile index sync failed: {e}")
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=run, name="profile-index-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    # ---- search -------------------------------------------------------------
+
+    def search(self, query: str, top_n: int = 10) -> List[Dict]:
+        """Returns the `top_n` indexed profiles most similar to `query`."""
+        with self._lock:
+            size = len(self.ids)
+            if size == 0:
+                return []
+            idf = inverse_document_frequency(self.document_frequency, size)
+            query_vector = l2_normalize(term_frequency_vector(query, self.dim) * idf)
+            scores = self._vectors[:size] @ query_vector
+
+            top_n = min(top_n, size)
+            top = np.argpartition(-scores, top_n - 1)[:top_n]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                {"profile_id": self.ids[i], "name": self.names[i], "score": round(float(scores[i]), 4)}
+                for i in top
+            ]
+
+    def find_near_duplicates(self, text: str, threshold: Optional[float] = None,
+                             exclude: Optional[str] = None) -> List[Dict]:
+        """Indexed profiles whose text is a near-duplicate of `text` (estimated Jaccard ≥ threshold)."""
+        threshold = default_threshold() if threshold is None else threshold
+        signature = minhash_signature(text)
+        with self._lock:
+            matches = []
+            for profile_id in self._lsh.candidates(signature):
+                if profile_id == exclude:
+                    continue
+                pos = self._positions[profile_id]
+                similarity = estimated_similarity(signature, self._signatures[pos])
+                if similarity >= threshold:
+                    matches.append({"profile_id": profile_id, "name": self.names[pos], "similarity": round(similarity, 3)})
+        return sorted(matches, key=lambda m: -m["similarity"])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "profiles": len(self.ids),
+                "dim": self.dim,
+                "capacity": int(self._vectors.shape[0]),
+                "watching": bool(self._watcher and self._watcher.is_alive()),
+            }
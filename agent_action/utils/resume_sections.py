@@ -0,0 +1,145 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set
+
+# Canonical section label → heading phrases that introduce it
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "career summary",
+                "objective", "career objective", "about me", "overview", "executive summary"],
+    "skills": ["skills", "technical skills", "core skills", "key skills", "skill set", "skillset", "core competencies",
+               "competencies", "technologies", "technical expertise", "tools and technologies", "tech stack",
+               "areas of expertise", "expertise"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "career history", "employment", "relevant experience", "professional background"],
+    "education": ["education", "academic background", "academic qualifications", "qualifications",
+                  "educational qualifications", "education and training", "academics"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses and certifications",
+                       "certifications and training", "training", "courses"],
+    "projects": ["projects", "key projects", "personal projects", "selected projects", "academic projects"],
+    "achievements": ["achievements", "awards", "honors", "honours", "accomplishments", "awards and achievements"],
+    "publications": ["publications", "research", "papers"],
+    "languages": ["languages", "spoken languages"],
+    "interests": ["interests", "hobbies", "hobbies and interests", "personal interests", "activities",
+                  "extracurricular activities", "volunteering", "volunteer experience"],
+    "references": ["references", "referees"],
+    "personal": ["personal details", "personal information", "personal data", "declaration", "contact",
+                 "contact information", "contact details"],
+}
+
+# Sections worth sending to the comparison model; text before the first heading is "header"
+RELEVANT_SECTIONS = ("header", "summary", "skills", "experience", "education", "certifications", "projects", "achievements")
+
+_HEADING_LOOKUP = {phrase: label for label, phrases in SECTION_HEADINGS.items() for phrase in phrases}
+_NORMALIZE_RE = re.compile(r"[^a-z& ]+")
+_MAX_HEADING_WORDS = 5
+
+
+def _normalize_heading(line: str) -> str:
+    line = line.lower().replace("&", " and ")
+    return " ".join(_NORMALIZE_RE.sub(" ", line).split())
+
+
+def classify_heading(line: str, layout_headings: Optional[Set[str]] = None) -> Optional[str]:
+    """
+    Returns the section label a line introduces, or None for body text.
+
+    A line counts as a heading when, after dropping punctuation and case, it is
+    a known heading phrase. Short lines that merely start with a known phrase
+    ("Skills & Tools", "Experience Highlights") count only when styled as a
+    heading: all caps, ending in a colon, or flagged by PDF layout.
+    """
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60:
+        return None
+    normalized = _normalize_heading(stripped)
+    if not normalized or len(normalized.split()) > _MAX_HEADING_WORDS:
+        return None
+    if normalized in _HEADING_LOOKUP:
+        return _HEADING_LOOKUP[normalized]
+
+    styled = (
+        stripped.endswith(":")
+        or (stripped.isupper() and len(stripped) > 3)
+        or (layout_headings is not None and stripped in layout_headings)
+    )
+    if not styled:
+        return None
+    words = normalized.split()
+    for size in range(len(words) - 1, 0, -1):
+        label = _HEADING_LOOKUP.get(" ".join(words[:size]))
+        if label:
+            return label
+    return None
+
+
+def segment_text(text: str, layout_headings: Optional[Set[str]] = None) -> Dict[str, str]:
+    """
+    Splits resume text into labeled sections.
+
+    Returns {label: text} in document order, where labels are the keys of
+    SECTION_HEADINGS plus "header" for anything before the first heading.
+    Inline headings ("Skills: Python, SQL") start a section too.
+    Sections that appear more than once are concatenated.
+    """
+    sections: Dict[str, list] = {}
+    current = "header"
+    for line in (text or "").splitlines():
+        label = classify_heading(line, layout_headings)
+        if label:
+            current = label
+            sections.setdefault(current, [])
+            continue
+
+        # Inline headings: "Skills: Python, SQL, AWS"
+        prefix, colon, rest = line.partition(":")
+        inline = _HEADING_LOOKUP.get(_normalize_heading(prefix)) if colon and rest.strip() else None
+        if inline:
+            current = inline
+            line = rest
+        if line.strip():
+            sections.setdefault(current, []).append(line.strip())
+    return {label: "\n".join(lines) for label, lines in sections.items() if lines}
+
+
+def pdf_layout_headings(doc, max_pages: int = 10) -> Set[str]:
+    """
+    Lines styled like headings in a PyMuPDF document: short lines set in bold
+    or in a font noticeably larger than the dominant body size.
+    """
+    lines = []
+    sizes = Counter()
+    for page in doc.pages(0, min(max_pages, doc.page_count)):
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                spans = [s for s in line["spans"] if s["text"].strip()]
+                if not spans:
+                    continue
+                text = "".join(s["text"] for s in spans).strip()
+                size = max(s["size"] for s in spans)
+                bold = all(s["flags"] & 16 or "bold" in s["font"].lower() for s in spans)
+                for s in spans:
+                    sizes[round(s["size"], 1)] += len(s["text"])
+                lines.append((text, size, bold))
+
+    if not sizes:
+        return set()
+    body_size = sizes.most_common(1)[0][0]
+    return {
+        text for text, size, bold in lines
+        if len(text.split()) <= _MAX_HEADING_WORDS and (bold or size >= body_size * 1.15)
+    }
+
+
+def relevant_sections_text(text: str, sections: Iterable[str] = RELEVANT_SECTIONS) -> str:
+    """
+    Keeps only the sections useful for JD matching (drops references, hobbies,
+    personal details, ...). Returns the text unchanged when no headings are found.
+    """
+    segmented = segment_text(text)
+    if set(segmented) <= {"header"}:
+        return text
+    keep = set(sections)
+    return "\n\n".join(
+        body if label == "header" else f"{label.title()}:\n{body}"
+        for label, body in segmented.items() if label in keep
+    )
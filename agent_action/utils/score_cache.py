@@ -0,0 +1,120 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+from pymongo import ReplaceOne
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of a document's text."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def make_pair_key(jd_hash: str, profile_hash: str, model_name: str, prompt_version: str) -> str:
+    """Cache key for one JD × profile score under a given model and prompt version."""
+    return f"{jd_hash}:{profile_hash}:{model_name}:{prompt_version}"
+
+
+class ScoreCache:
+    """
+    Two-tier cache of JD × profile comparison scores.
+
+    A bounded in-process LRU sits in front of an optional Mongo collection whose
+    documents expire through a TTL index on `createdAt`. Values are the parts of a
+    ComparisonResult that depend only on the document contents
+    (`applicant_name`, `similarity_score`, `reasoning`).
+    """
+
+    def __init__(self, collection=None, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.collection = collection
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("SCORE_CACHE_SIZE", "10000"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("SCORE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+
+        if self.collection is not None:
+            try:
+                self.collection.create_index("createdAt", expireAfterSeconds=self.ttl_seconds)
+            except Exception as e:
+                print(f"⚠️ Could not create TTL index for score cache: {e}")
+
+    def _remember(self, key: str, value: Dict, stored_at: float):
+        self._memory[key] = (value, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """Returns cached values for the given keys; missing keys are omitted."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+
+        with self._lock:
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is None:
+                    continue
+                value, stored_at = entry
+                if now - stored_at > self.ttl_seconds:
+                    del self._memory[key]
+                    continue
+                self._memory.move_to_end(key)
+                found[key] = value
+            self.memory_hits += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.collection is not None:
+            try:
+                cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+                docs = self.collection.find({"_id": {"$in": missing}, "createdAt": {"$gte": cutoff}})
+                with self._lock:
+                    for doc in docs:
+                        found[doc["_id"]] = doc["value"]
+                        self._remember(doc["_id"], doc["value"], doc["createdAt"].replace(tzinfo=timezone.utc).timestamp())
+                        self.mongo_hits += 1
+            except Exception as e:
+                print(f"⚠️ Score cache lookup failed: {e}")
+
+        with self._lock:
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Dict[str, Dict]):
+        """Stores values in the memory tier and upserts them into Mongo."""
+        if not entries:
+            return
+
+        now = datetime.utcnow()
+        with self._lock:
+            for key, value in entries.items():
+                self._remember(key, value, time.time())
+
+        if self.collection is not None:
+            try:
+                self.collection.bulk_write(
+                    [
+                        ReplaceOne({"_id": key}, {"_id": key, "value": value, "createdAt": now}, upsert=True)
+                        for key, value in entries.items()
+                    ],
+                    ordered=False
+                )
+            except Exception as e:
+                print(f"⚠️ Score cache write failed: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "mongo_hits": self.mongo_hits,
+                "misses": self.misses,
+            }
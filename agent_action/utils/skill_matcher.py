@@ -0,0 +1,289 @@
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .score_cache import content_hash
+
+# Canonical skill → aliases. Aliases are matched case-insensitively on word
+# boundaries; aliases prefixed with "=" are matched case-sensitively, for names
+# that are also ordinary words ("Go", "R", "REST", "Excel").
+TECHNICAL_SKILLS: Dict[str, List[str]] = {
+    "Python": ["python", "python3", "py3"],
+    "Java": ["java", "j2ee", "java ee", "jdk"],
+    "JavaScript": ["javascript", "js", "ecmascript", "es6", "vanilla js"],
+    "TypeScript": ["typescript", "=TS"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "Go": ["golang", "=Go"],
+    "Rust": ["rust", "rustlang"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Scala": ["scala"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["=Swift", "swiftui"],
+    "R": ["=R", "rstudio"],
+    "MATLAB": ["matlab"],
+    "SQL": ["sql", "t-sql", "tsql", "pl/sql", "plsql"],
+    "NoSQL": ["nosql"],
+    "Bash": ["bash", "shell scripting", "shell script"],
+    "PowerShell": ["powershell"],
+    "React": ["react", "react.js", "reactjs", "react js"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue.js": ["vue", "vue.js", "vuejs"],
+    "Next.js": ["next.js", "nextjs"],
+    "Node.js": ["node.js", "nodejs", "node js"],
+    "Express": ["express.js", "expressjs", "=Express"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring": ["spring boot", "springboot", "spring framework", "spring mvc"],
+    ".NET": [".net", "dotnet", "asp.net", ".net core"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "scss", "sass"],
+    "Tailwind CSS": ["tailwind", "tailwindcss", "tailwind css"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["=REST", "restful", "rest api", "rest apis", "restful api", "restful apis"],
+    "gRPC": ["grpc"],
+    "Microservices": ["microservices", "microservice", "micro-services"],
+    "AWS": ["aws", "amazon web services", "ec2", "s3", "lambda", "aws lambda"],
+    "Azure": ["azure", "microsoft azure"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker", "containers", "containerization"],
+    "Kubernetes": ["kubernetes", "k8s", "eks", "aks", "gke", "openshift"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "Jenkins": ["jenkins"],
+    "CI/CD": ["ci/cd", "cicd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment",
+              "github actions", "gitlab ci"],
+    "Git": ["git", "github", "gitlab", "bitbucket"],
+    "Linux": ["linux", "unix", "ubuntu", "rhel", "centos"],
+    "Kafka": ["kafka", "apache kafka"],
+    "RabbitMQ": ["rabbitmq"],
+    "Spark": ["spark", "pyspark", "apache spark"],
+    "Hadoop": ["hadoop", "hdfs", "hive"],
+    "Airflow": ["airflow", "apache airflow"],
+    "Snowflake": ["snowflake"],
+    "Databricks": ["databricks"],
+    "PostgreSQL": ["postgresql", "postgres", "psql"],
+    "MySQL": ["mysql", "mariadb"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic search", "opensearch", "elk"],
+    "Oracle": ["oracle", "oracle db"],
+    "DynamoDB": ["dynamodb"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "TensorFlow": ["tensorflow", "tf2"],
+    "PyTorch": ["pytorch", "torch"],
+    "Keras": ["keras"],
+    "NLP": ["nlp", "natural language processing"],
+    "LLMs": ["llm", "llms", "large language models", "large language model", "generative ai", "genai"],
+    "LangChain": ["langchain"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning", "neural networks", "neural network"],
+    "Data Science": ["data science"],
+    "Computer Vision": ["computer vision", "opencv"],
+    "Statistics": ["statistics", "statistical analysis", "statistical modeling"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["=Excel", "ms excel", "microsoft excel"],
+    "ETL": ["etl", "elt", "data pipelines", "data pipeline"],
+    "Data Engineering": ["data engineering"],
+    "DevOps": ["devops", "dev ops"],
+    "SRE": ["sre", "site reliability engineering", "site reliability"],
+    "Security": ["security", "cybersecurity", "cyber security", "infosec", "appsec"],
+    "Selenium": ["selenium"],
+    "Cypress": ["cypress"],
+    "Jest": ["jest"],
+    "pytest": ["pytest"],
+    "JUnit": ["junit"],
+    "Agile": ["agile"],
+    "Scrum": ["scrum"],
+    "Jira": ["jira"],
+    "Figma": ["figma"],
+    "Salesforce": ["salesforce", "sfdc"],
+    "SAP": ["sap", "sap hana", "s/4hana"],
+    "ServiceNow": ["servicenow"],
+    "Prometheus": ["prometheus"],
+    "Grafana": ["grafana"],
+}
+
+SOFT_SKILLS: Dict[str, List[str]] = {
+    "Leadership": ["leadership", "led a team", "team lead", "team leadership"],
+    "Communication": ["communication", "communication skills", "communicator"],
+    "Teamwork": ["teamwork", "team player"],
+    "Collaboration": ["collaboration", "collaborative", "collaborated"],
+    "Mentoring": ["mentoring", "mentored", "mentorship"],
+    "Problem Solving": ["problem solving", "problem-solving", "troubleshooting"],
+    "Stakeholder Management": ["stakeholder management", "stakeholder engagement", "stakeholders"],
+    "Ownership": ["ownership"],
+    "Time Management": ["time management"],
+    "Critical Thinking": ["critical thinking"],
+    "Adaptability": ["adaptability", "adaptable"],
+    "Presentation": ["presentation", "presentations", "public speaking"],
+    "Negotiation": ["negotiation"],
+    "Decision Making": ["decision making", "decision-making"],
+    "Coaching": ["coaching"],
+    "Cross-functional": ["cross-functional", "cross functional"],
+    "Analytical": ["analytical", "analytical skills"],
+    "Attention to Detail": ["attention to detail", "detail-oriented", "detail oriented"],
+    "Customer Focus": ["customer focus", "customer-focused", "customer facing", "client facing"],
+    "Self-motivated": ["self-motivated", "self motivated", "self-starter"],
+    "Conflict Resolution": ["conflict resolution"],
+}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class _Automaton:
+    """Aho-Corasick automaton over characters; one pass finds every alias occurrence."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, int]]] = [[]]  # (pattern length, payload)
+
+        for pattern, payload in patterns:
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = nxt
+            self.output[node].append((len(pattern), payload))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0) if self.goto[f].get(ch, 0) != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find(self, text: str) -> Iterable[int]:
+        """Yields the payload of every alias found on word boundaries."""
+        node = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        length = len(text)
+        for end, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not output[node]:
+                continue
+            after_ok = end + 1 == length or not _is_word_char(text[end + 1])
+            for size, payload in output[node]:
+                start = end - size + 1
+                if (start == 0 or not _is_word_char(text[start - 1]) or not _is_word_char(text[start])) and \
+                        (after_ok or not _is_word_char(text[end])):
+                    yield payload
+
+
+class SkillMatcher:
+    """
+    Extracts canonical skills from text in a single pass.
+
+    The taxonomy (canonical skill → aliases) is compiled once into an
+    Aho-Corasick automaton, so matching cost grows with the document length,
+    not the number of skills. Results are cached per document hash, and
+    `overlap_matrix` scores skill overlap for many documents at once with
+    NumPy instead of per-pair set operations.
+    """
+
+    def __init__(self, taxonomy: Optional[Dict[str, Dict[str, List[str]]]] = None, cache_size: Optional[int] = None):
+        taxonomy = taxonomy or {"technical": TECHNICAL_SKILLS, "soft": SOFT_SKILLS}
+        self.cache_size = cache_size if cache_size is not None else int(os.getenv("SKILL_CACHE_SIZE", "10000"))
+
+        self.skills: List[str] = []
+        self.categories: List[str] = []
+        folded, exact = [], []
+        for category, skills in taxonomy.items():
+            for canonical, aliases in skills.items():
+                index = len(self.skills)
+                self.skills.append(canonical)
+                self.categories.append(category)
+                for alias in aliases:
+                    if alias.startswith("="):
+                        exact.append((alias[1:], index))
+                    else:
+                        folded.append((alias.lower(), index))
+
+        self.index = {skill: i for i, skill in enumerate(self.skills)}
+        self._folded = _Automaton(folded)
+        self._exact = _Automaton(exact)
+        self._cache: "OrderedDict[str, FrozenSet[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _match_ids(self, text: str) -> FrozenSet[int]:
+        key = content_hash(text)
+        with self._lock:
+            found = self._cache.get(key)
+            if found is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return found
+
+        found = frozenset(self._folded.find(text.lower())) | frozenset(self._exact.find(text))
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = found
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return found
+
+    def extract(self, text: str, category: Optional[str] = None) -> FrozenSet[str]:
+        """Canonical skills mentioned in `text`, optionally limited to one category."""
+        return frozenset(
+            self.skills[i] for i in self._match_ids(text or "")
+            if category is None or self.categories[i] == category
+        )
+
+    def skill_matrix(self, skill_sets: Sequence[Iterable[str]]) -> np.ndarray:
+        """Boolean (documents × vocabulary) matrix for a list of canonical skill sets."""
+        matrix = np.zeros((len(skill_sets), len(self.skills)), dtype=np.float32)
+        for row, skills in enumerate(skill_sets):
+            columns = [self.index[s] for s in skills if s in self.index]
+            matrix[row, columns] = 1.0
+        return matrix
+
+    def overlap_matrix(self, required: Sequence[Iterable[str]], present: Sequence[Iterable[str]]) -> np.ndarray:
+        """
+        Fraction of each required set covered by each present set, as an
+        (len(required) × len(present)) array; rows with no requirements are 0.
+        """
+        req = self.skill_matrix(required)
+        have = self.skill_matrix(present)
+        counts = req.sum(axis=1, keepdims=True)
+        return np.divide(req @ have.T, counts, out=np.zeros((len(required), len(present)), dtype=np.float32), where=counts > 0)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"skills": len(self.skills), "cached_documents": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+_default_matcher: Optional[SkillMatcher] = None
+_default_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Process-wide SkillMatcher, compiled on first use."""
+    global _default_matcher
+    with _default_lock:
+        if _default_matcher is None:
+            _default_matcher = SkillMatcher()
+        return _default_matcher
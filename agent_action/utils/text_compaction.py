@@ -0,0 +1,116 @@
+import re
+import unicodedata
+from typing import Dict, Tuple
+
+from .resume_sections import relevant_sections_text
+
+# Lines that carry no signal for matching: page furniture and contact details.
+# Labelled page numbers ("Page 3", "Page 3 of 5", "- 3 -") are dropped anywhere;
+# bare numbers ("3", "3/5", "3 of 5") could be skill levels or years, so they are
+# only treated as page numbers at page boundaries (see compact_text).
+_PAGE_LABEL_RE = re.compile(r"^page\s*\d{1,3}(\s*(of|/)\s*\d{1,3})?$|^[-–—]\s*\d{1,3}\s*[-–—]$", re.IGNORECASE)
+_BARE_PAGE_NUMBER_RE = re.compile(r"^\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+# PDF extraction separates pages with a form feed
+PAGE_BREAK = "\f"
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"(?:\+?\d[\s().-]{0,2}){9,15}")
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+|\b(?:linkedin|github)\.com/\S*", re.IGNORECASE)
+_CONTACT_LABEL_RE = re.compile(r"^(e-?mail|phone|mobile|tel|contact|address|linkedin|github|website)\s*[:|-]?\s*", re.IGNORECASE)
+_INLINE_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u202f\u205f\u3000]+")
+_BULLET_RE = re.compile(r"^[•●▪■◦\-–*·]+\s*")
+
+# Roughly four characters per token for Gemini/English text.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for reporting and shard budgeting."""
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalizes text and collapses runs of inline whitespace."""
+    text = unicodedata.normalize("NFKC", text or "")
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return "\n".join(lines)
+
+
+def _is_contact_line(line: str) -> bool:
+    stripped = line
+    for pattern in (_EMAIL_RE, _URL_RE, _PHONE_RE):
+        stripped = pattern.sub("", stripped)
+    stripped = _CONTACT_LABEL_RE.sub("", stripped.strip())
+    # Nothing meaningful left once contact details are removed
+    return len(re.sub(r"[\W_]+", "", stripped)) == 0 and stripped != line
+
+
+def _boundary_page_numbers(pages) -> set:
+    """
+    (page, line) positions of bare numbers that open or close a page. They
+    only count as page numbers when at least two pages have one.
+    """
+    found = set()
+    for p, lines in enumerate(pages):
+        for i in ({0, len(lines) - 1} if lines else ()):
+            if _BARE_PAGE_NUMBER_RE.match(lines[i]):
+                found.add((p, i))
+    return found if len({p for p, _ in found}) >= 2 else set()
+
+
+def compact_text(text: str) -> str:
+    """
+    Removes non-informative content from extracted document text.
+
+    - Normalizes unicode and whitespace, and drops empty lines
+    - Drops page numbers: labelled ones anywhere, bare numbers only where they
+      open or close pages (form-feed separated PDF text)
+    - Drops lines that only contain contact details (email, phone, URLs)
+    - Removes duplicate lines such as repeated PDF headers/footers, keeping
+      the first occurrence (bare numbers are kept, they are usually table values)
+    """
+    pages = [
+        [line for line in normalize_text(page).split("\n") if line]
+        for page in (text or "").split(PAGE_BREAK)
+    ]
+    page_numbers = _boundary_page_numbers(pages)
+
+    seen = set()
+    kept = []
+    for p, lines in enumerate(pages):
+        for i, line in enumerate(lines):
+            if (p, i) in page_numbers or _PAGE_LABEL_RE.match(line) or _is_contact_line(line):
+                continue
+            # Bare numbers are table values (years, levels); repeats are not furniture
+            if not _BARE_PAGE_NUMBER_RE.match(line):
+                key = _BULLET_RE.sub("", line).lower()
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+    return "\n".join(kept)
+
+
+def compact_profiles(profiles: Dict[str, str], sections_only: bool = False) -> Tuple[Dict[str, str], Dict]:
+    """
+    Compacts every profile and reports estimated tokens before and after.
+    With `sections_only`, sections irrelevant to matching (references,
+    hobbies, personal details, ...) are dropped first.
+
+    Returns:
+        Tuple of (compacted profiles, token report).
+    """
+    compacted = {}
+    per_profile = {}
+    for name, content in profiles.items():
+        compacted[name] = compact_text(relevant_sections_text(content) if sections_only else content)
+        per_profile[name] = {
+            "tokens_before": estimate_tokens(content),
+            "tokens_after": estimate_tokens(compacted[name]),
+        }
+
+    return compacted, {
+        "tokens_before": sum(p["tokens_before"] for p in per_profile.values()),
+        "tokens_after": sum(p["tokens_after"] for p in per_profile.values()),
+        "per_profile": per_profile,
+    }
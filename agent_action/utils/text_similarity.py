@@ -0,0 +1,93 @@
+import re
+import zlib
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Terms are hashed into a fixed number of buckets so vectors from different
+# calls (and processes) share one feature space without a vocabulary.
+HASH_DIM = 2 ** 14
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can for from has have in into is it its of on or our
+such that the their them they this to was we were will with you your who what which
+about across also all any each more most other should would may must than then there
+these those within without per via etc
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases and splits text into terms, keeping tokens like c++, c# and node.js."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def hash_token(token: str, dim: int = HASH_DIM) -> int:
+    """Stable bucket for a token (Python's hash() is salted per process)."""
+    return zlib.crc32(token.encode("utf-8")) % dim
+
+
+def term_frequency_vector(text: str, dim: int = HASH_DIM) -> np.ndarray:
+    """Sublinear (1 + log tf) hashed term-frequency vector for one document."""
+    tokens = tokenize(text)
+    if not tokens:
+        return np.zeros(dim, dtype=np.float32)
+    indices = np.fromiter((hash_token(t, dim) for t in tokens), dtype=np.int64, count=len(tokens))
+    counts = np.bincount(indices, minlength=dim).astype(np.float32)
+    nonzero = counts > 0
+    counts[nonzero] = 1.0 + np.log(counts[nonzero])
+    return counts
+
+
+def inverse_document_frequency(document_frequency: np.ndarray, n_documents: int) -> np.ndarray:
+    """Smoothed idf, as in scikit-learn's TfidfTransformer."""
+    return (np.log((1.0 + n_documents) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def tfidf_matrix(texts: List[str], dim: int = HASH_DIM) -> np.ndarray:
+    """L2-normalized TF-IDF rows for `texts`, with idf computed over the same texts."""
+    tf = np.vstack([term_frequency_vector(t, dim) for t in texts]) if texts else np.zeros((0, dim), dtype=np.float32)
+    idf = inverse_document_frequency((tf > 0).sum(axis=0), len(texts))
+    return l2_normalize(tf * idf)
+
+
+def prefilter_profiles(
+    jd_content: str,
+    profiles: Dict[str, str],
+    top_k: Optional[int] = None,
+    threshold: Optional[float] = None
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Scores every profile against the JD with TF-IDF cosine similarity and keeps
+    the top-K profiles and/or those scoring at least `threshold`.
+
+    Args:
+        jd_content: The job description text.
+        profiles: Dictionary of profile name to content.
+        top_k: Optional maximum number of profiles to keep.
+        threshold: Optional minimum cosine similarity (0.0-1.0) to keep a profile.
+
+    Returns:
+        Tuple of (selected profiles, cosine score for every input profile).
+    """
+    if not profiles:
+        return {}, {}
+
+    names = list(profiles.keys())
+    matrix = tfidf_matrix([jd_content] + [profiles[n] for n in names])
+    scores = matrix[1:] @ matrix[0]
+
+    order = np.argsort(-scores, kind="stable")
+    if threshold is not None:
+        order = order[scores[order] >= threshold]
+    if top_k is not None:
+        order = order[:top_k]
+
+    selected = {names[i]: profiles[names[i]] for i in order}
+    return selected, {name: round(float(score), 4) for name, score in zip(names, scores)}
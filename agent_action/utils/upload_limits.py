@@ -0,0 +1,174 @@
+import os
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Iterable, Optional
+
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024)
+MAX_REQUEST_BYTES = int(float(os.getenv("MAX_UPLOAD_REQUEST_MB", "200")) * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds its size limit (reported as HTTP 413)."""
+
+
+def upload_size(file) -> Optional[int]:
+    """Size of a spooled UploadFile without reading it, if it can be determined."""
+    size = getattr(file, "size", None)
+    if size is not None:
+        return size
+    try:
+        position = file.file.tell()
+        size = file.file.seek(0, os.SEEK_END)
+        file.file.seek(position)
+        return size
+    except Exception:
+        return None
+
+
+def reservation_size(file, max_bytes: int = MAX_UPLOAD_BYTES) -> int:
+    """Bytes to reserve in a ByteBudget for an upload (never more than the per-file limit)."""
+    size = upload_size(file)
+    return min(size, max_bytes) if size is not None else max_bytes
+
+
+async def read_upload(file, max_bytes: int = MAX_UPLOAD_BYTES, chunk_size: int = UPLOAD_CHUNK_SIZE) -> bytes:
+    """
+    Reads an UploadFile in chunks, failing fast with UploadTooLarge as soon as
+    its declared or actual size passes `max_bytes`.
+    """
+    size = upload_size(file)
+    if size is not None and size > max_bytes:
+        raise UploadTooLarge(f"{file.filename} is {size / 1048576:.1f} MB; the limit is {max_bytes / 1048576:.0f} MB")
+
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        if len(buffer) + len(chunk) > max_bytes:
+            raise UploadTooLarge(f"{file.filename} exceeds the {max_bytes / 1048576:.0f} MB upload limit")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+class ByteBudget:
+    """
+    Global cap on bytes being read and parsed at once.
+
+    Each upload reserves its size before it is read and releases it after
+    parsing; when the budget is exhausted, further uploads wait in line instead
+    of piling more documents into memory. A single upload larger than the whole
+    budget is admitted on its own once everything else has drained.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, timeout: Optional[float] = None):
+        self.capacity = capacity or int(float(os.getenv("MAX_INFLIGHT_UPLOAD_MB", "256")) * 1024 * 1024)
+        self.timeout = timeout if timeout is not None else float(os.getenv("UPLOAD_QUEUE_TIMEOUT_SECONDS", "120"))
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: int):
+        nbytes = min(max(nbytes, 1), self.capacity)
+        async with self.condition:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(
+                    self.condition.wait_for(lambda: self.in_flight + nbytes <= self.capacity),
+                    timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Server busy: timed out after {self.timeout:g}s waiting for upload capacity")
+            finally:
+                self.waiting -= 1
+            self.in_flight += nbytes
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.in_flight -= nbytes
+                self.condition.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "capacity_bytes": self.capacity,
+            "in_flight_bytes": self.in_flight,
+            "peak_bytes": self.peak,
+            "waiting": self.waiting,
+        }
+
+
+class RequestSizeLimitMiddleware:
+    """
+    ASGI middleware that answers 413 for oversized upload requests before the
+    multipart body is spooled: up front from Content-Length, or as soon as the
+    streamed body passes `max_bytes` when no length is declared.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_REQUEST_BYTES, paths: Iterable[str] = ()):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = set(paths)
+
+    async def _reject(self, send):
+        body = json.dumps({
+            "status": "error",
+            "message": f"Request body exceeds the {self.max_bytes / 1048576:.0f} MB limit"
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            return await self._reject(send)
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise UploadTooLarge("Request body too large")
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # Replace whatever error the app produced for the aborted body with a 413
+            if exceeded:
+                if not response_started:
+                    response_started = True
+                    await self._reject(send)
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLarge:
+            if not response_started:
+                await self._reject(send)
@@ -0,0 +1,179 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+_DUPLICATE_KEY = 11000
+
+
+class BulkWriter:
+    """
+    Write-behind buffer in front of a Mongo collection.
+
+    `submit` only appends the document to an in-memory buffer; a background
+    thread writes buffered documents with `insert_many` once `batch_size` are
+    waiting or `flush_interval` seconds have passed, and `stop` drains the
+    buffer on shutdown. The buffer holds at most `max_buffered` documents:
+    when it is full `submit` returns False and the caller should write the
+    document itself, so memory stays bounded without losing data.
+
+    Batches that fail to reach the server are put back at the head of the
+    buffer and retried after a backoff that starts at `flush_interval` and
+    doubles on every consecutive failure, up to `max_backoff`. Documents the server rejects
+    (validation errors) are dropped and counted; duplicate-key errors mean a
+    retried document was already written, since pymongo assigns `_id`s
+    before sending.
+    """
+
+    def __init__(self, collection, batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 max_buffered: Optional[int] = None, max_backoff: Optional[float] = None, name: str = "writer"):
+        self.collection = collection
+        self.name = name
+        self.batch_size = batch_size or int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "2"))
+        self.max_buffered = max_buffered or int(os.getenv("WRITE_BEHIND_MAX_BUFFERED", "5000"))
+        self.max_backoff = max_backoff if max_backoff is not None else float(os.getenv("WRITE_BEHIND_MAX_BACKOFF_SECONDS", "60"))
+
+        self._buffer: deque = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.submitted = 0
+        self.rejected = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.consecutive_failures = 0
+        self.peak_buffered = 0
+        self.last_flush_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=f"bulk-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stops the flusher thread after writing whatever is still buffered."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # Anything left (thread never started, or join timed out) is written inline
+        self.flush()
+        with self._condition:
+            unwritten = len(self._buffer)
+        if unwritten:
+            print(f"❌ {self.name}: {unwritten} buffered document(s) could not be written before shutdown")
+
+    def submit(self, document: Dict) -> bool:
+        """Buffers a document for insertion. Returns False if the buffer is full."""
+        with self._condition:
+            if len(self._buffer) >= self.max_buffered:
+                self.rejected += 1
+                self._condition.notify_all()
+                return False
+            self._buffer.append(document)
+            self.submitted += 1
+            self.peak_buffered = max(self.peak_buffered, len(self._buffer))
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+            return True
+
+    def _take(self) -> List[Dict]:
+        batch = []
+        while self._buffer and len(batch) < self.batch_size:
+            batch.append(self._buffer.popleft())
+        return batch
+
+    def _write(self, batch: List[Dict]) -> bool:
+        # Counters are read by stats() from other threads, so they change under the lock
+        start = time.perf_counter()
+        try:
+            self.collection.insert_many(batch, ordered=False)
+            rejected = []
+        except BulkWriteError as e:
+            rejected = [err for err in e.details.get("writeErrors", []) if err.get("code") != _DUPLICATE_KEY]
+        except Exception as e:
+            self._fail(str(e), batch, start)
+            return False
+
+        with self._condition:
+            self.flushes += 1
+            self.consecutive_failures = 0
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.written += len(batch) - len(rejected)
+            if rejected:
+                self.dropped += len(rejected)
+                self.last_error = rejected[0].get("errmsg")
+        if rejected:
+            print(f"❌ {self.name}: dropped {len(rejected)} document(s) rejected by the server: {rejected[0].get('errmsg')}")
+        return True
+
+    def _fail(self, message: str, documents: List[Dict], start: float):
+        with self._condition:
+            self.flushes += 1
+            self.failed_flushes += 1
+            self.consecutive_failures += 1
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.last_error = message
+            self._buffer.extendleft(reversed(documents))
+        print(f"⚠️ {self.name}: bulk insert failed, retrying {len(documents)} document(s) in {self._retry_delay():.1f}s: {message}")
+
+    def _retry_delay(self) -> float:
+        """Seconds to wait before retrying after consecutive failed flushes; 0 when the last flush worked."""
+        if not self.consecutive_failures:
+            return 0.0
+        base = self.flush_interval or 1.0
+        return min(base * 2 ** (self.consecutive_failures - 1), max(self.max_backoff, base))
+
+    def flush(self) -> int:
+        """Writes everything currently buffered; stops at the first failed batch. Returns documents written."""
+        written = 0
+        while True:
+            with self._condition:
+                batch = self._take()
+            if not batch or not self._write(batch):
+                return written
+            written += len(batch)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                delay = self._retry_delay()
+                if delay:
+                    # Back off after a failed flush; a full buffer does not cut the wait short
+                    self._condition.wait_for(lambda: self._stopping, delay)
+                elif not self._stopping and len(self._buffer) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                "buffered": len(self._buffer),
+                "peak_buffered": self.peak_buffered,
+                "max_buffered": self.max_buffered,
+                "submitted": self.submitted,
+                "written": self.written,
+                "rejected": self.rejected,
+                "dropped": self.dropped,
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "retry_in_seconds": self._retry_delay(),
+                "last_flush_ms": self.last_flush_ms,
+                "last_error": self.last_error,
+                "running": self._thread is not None and self._thread.is_alive(),
+            }
@@ -3,22 +3,61 @@ Agent backend server implementation.
 """
 
 import os
-import tempfile
-import shutil
-import uvicorn
+import sys
+
+if __name__ == "__main__":
+    # `python server.py` hands over to the uvicorn CLI before any app setup runs.
+    # Spawned extraction workers re-import the main script as __mp_main__; with
+    # uvicorn as the main module they no longer rebuild the Mongo clients,
+    # agents, indexes and queues below in every worker.
+    print("🚀 Starting agent server...")
+    print("📡 Available at: http://localhost:8000")
+    print("🏥 Health check: http://localhost:8000/health")
+    print("📄 Upload endpoint: http://localhost:8000/process-upload")
+    print("📚 Bulk Upload endpoint: http://localhost:8000/process-uploads")
+    print("🤖 Run Agent endpoint: http://localhost:8000/run-agent")
+    print("📡 Streaming Run Agent endpoint: http://localhost:8000/run-agent/stream")
+    print("🧾 Job endpoints: http://localhost:8000/jobs")
+    print("🔎 Profile Search endpoint: http://localhost:8000/search")
+    print("📊 Generate Report endpoint: http://localhost:8000/generate-report")
+    print("📋 Generate JD Report endpoint: http://localhost:8000/generate-jd-report")
+    print("👤 Generate Profile Report endpoint: http://localhost:8000/generate-profile-report")
+    # Render provides PORT environment variable; default to 8000 locally.
+    # Disable reload by default in production; enable by setting RELOAD=true.
+    port = os.getenv("PORT", "8000")
+    reload_flag = os.getenv("RELOAD", "true").lower() == "true"
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    os.execv(sys.executable, [
+        sys.executable, "-m", "uvicorn", "server:app", "--host", "0.0.0.0", "--port", port
+    ] + (["--reload"] if reload_flag else []))
+
+import json
+import time
+import asyncio
+from typing import List
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
 from dotenv import load_dotenv
 
 from fastapi import FastAPI, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
 
 # Agent imports
-from agent_action.agents.comparison_agent import ComparisonAgent
-from agent_action.agents.ranking_agent import RankingAgent
-from agent_action.agents.communication_agent import CommunicationAgent
-from agent_action.agents.report_agent import ReportAgent
+from agent_action.agents.registry import AgentRegistry
 
 # Utility imports
-from agent_action.utils.document_loader import load_documents_from_folder, load_document
+from agent_action.utils.document_loader import load_documents_from_folder, load_document_with_sections, get_extraction_cache, shutdown_pdf_pool
+from agent_action.utils.extraction_worker import ExtractionPool
+from agent_action.utils.score_cache import ScoreCache
+from agent_action.utils.text_similarity import prefilter_profiles
+from agent_action.utils.text_compaction import compact_profiles, compact_text, estimate_tokens
+from agent_action.utils.profile_index import ProfileIndex
+from agent_action.utils.job_queue import JobQueue, JobWorkerPool, TERMINAL_STATES
+from agent_action.utils.near_duplicates import find_duplicate_groups, expand_duplicate_results
+from agent_action.utils.upload_limits import ByteBudget, RequestSizeLimitMiddleware, UploadTooLarge, read_upload, reservation_size
+from agent_action.utils.write_behind import BulkWriter
+from agent_action.utils.pdf_storage import PdfStorage
 from agent_action.config import SENDER_EMAIL
 from pymongo import MongoClient
 from datetime import datetime
@@ -34,10 +73,30 @@ client = MongoClient(MONGO_URI)
 db = client[DB_NAME]
 comparison_collection = db["ComparisonResult"]  # Match your schema name
 
+# Comparison sessions are buffered and written with insert_many off the request path
+session_writer = BulkWriter(comparison_collection, name="ComparisonResult")
+
+# JD × profile score cache (in-process LRU in front of a TTL'd Mongo collection)
+score_cache = ScoreCache(db["ComparisonScoreCache"])
+
+# Local vector index over consultantprofiles.resumeText (persisted to disk)
+profile_collection = db["consultantprofiles"]
+profile_index = ProfileIndex()
+jd_collection = db["jobdescriptions"]
+
+# Resume PDFs: BSON Binary in the profile document, GridFS for large files
+pdf_storage = PdfStorage(db)
+
+# Long-lived agents (Gemini clients, parsers, prompts) shared across requests
+agent_registry = AgentRegistry(score_cache=score_cache)
+
 
 # FastAPI app setup
 app = FastAPI()
 
+# Reject oversized upload requests before their bodies are spooled
+app.add_middleware(RequestSizeLimitMiddleware, paths={"/process-upload", "/process-uploads"})
+
 # CORS middleware setup for frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -52,6 +111,83 @@ JD_FOLDER = "agent_action/data/jd"
 PROFILES_FOLDER = "agent_action/data/profiles"
 
 
+@app.on_event("startup")
+async def warm_up_agents():
+    try:
+        await asyncio.to_thread(agent_registry.warm_up)
+    except Exception as e:
+        print(f"⚠️ Agent warm-up failed: {e}")
+
+
+@app.on_event("startup")
+async def start_profile_index():
+    """Brings the profile index up to date and keeps it in sync with Mongo."""
+    # Re-uploaded or deleted profiles must not keep serving their old PDF from the attachment cache
+    profile_index.add_listener(
+        lambda profile_ids: agent_registry.communication_agent().attachment_cache.invalidate_many(profile_ids)
+    )
+    try:
+        await asyncio.to_thread(profile_index.sync, profile_collection)
+    except Exception as e:
+        print(f"⚠️ Initial profile index sync failed: {e}")
+    profile_index.start_watching(profile_collection)
+
+
+@app.on_event("shutdown")
+async def stop_profile_index():
+    profile_index.stop_watching()
+
+
+# Bounded process pool for CPU-bound document extraction (/process-uploads)
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "60"))
+# Workers are spawned on first use; a dead or hung worker gets the pool replaced
+extraction_pool = ExtractionPool(EXTRACTION_WORKERS, EXTRACTION_TIMEOUT_SECONDS)
+
+# Global cap on upload bytes being read/parsed at once; excess uploads wait
+upload_budget = ByteBudget()
+
+
+@app.on_event("startup")
+async def start_extraction_pool():
+    async def warm_up():
+        try:
+            ready = await asyncio.to_thread(extraction_pool.warm_up)
+            print(f"🧰 {ready} extraction worker(s) ready")
+        except Exception as e:
+            print(f"⚠️ Extraction pool warm-up failed: {e}")
+
+    # Workers start in the background; uploads arriving meanwhile just queue
+    asyncio.create_task(warm_up())
+
+
+@app.on_event("shutdown")
+async def stop_extraction_pool():
+    extraction_pool.shutdown()
+    await asyncio.to_thread(shutdown_pdf_pool)
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    job_workers.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_workers.stop()
+
+
+@app.on_event("startup")
+async def start_session_writer():
+    session_writer.start()
+
+
+@app.on_event("shutdown")
+async def stop_session_writer():
+    # Flushes whatever is still buffered before the process exits
+    await asyncio.to_thread(session_writer.stop)
+
+
 @app.get("/")
 async def root():
     return {"message": "Agent server is running!", "status": "active"}
@@ -62,27 +198,48 @@ async def health_check():
     return {"status": "healthy", "agents": "ready"}
 
 
+@app.get("/agents/stats")
+async def agent_stats():
+    """Agent pool and cache statistics for monitoring."""
+    extraction_cache = get_extraction_cache()
+    return {
+        "agents": agent_registry.stats(),
+        "score_cache": score_cache.stats(),
+        "profile_index": profile_index.stats(),
+        "extraction_cache": extraction_cache.stats() if extraction_cache else None,
+        "uploads": upload_budget.stats(),
+        "extraction_pool": extraction_pool.stats(),
+        "skill_matcher": agent_registry.skill_matcher().stats(),
+        "attachment_cache": agent_registry.communication_agent().attachment_cache.stats(),
+        "jobs": job_workers.stats(),
+        "session_writer": session_writer.stats()
+    }
+
+
 @app.post("/process-upload")
 async def process_uploaded_file(file: UploadFile = File(...)):
     """
     Extracts text from an uploaded .txt, .pdf, or .docx file
-    using the document_loader utility.
+    using the document_loader utility, along with its resume sections.
     """
     try:
-        ext = os.path.splitext(file.filename)[1]
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        extracted_text = load_document(tmp_path)
-        os.remove(tmp_path)
+        # Reserve the upload's size against the global in-flight budget, then
+        # read in chunks and parse straight from memory; no temp file round trip
+        async with upload_budget.reserve(reservation_size(file)):
+            content = await read_upload(file)
+            extracted = await asyncio.to_thread(load_document_with_sections, content, file.filename)
 
+        near_duplicates = await asyncio.to_thread(profile_index.find_near_duplicates, extracted["content"])
         return {
             "filename": file.filename,
-            "content": extracted_text
+            "content": extracted["content"],
+            "sections": extracted["sections"],
+            "near_duplicates": near_duplicates
         }
 
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"status": "error", "message": str(e)})
+
     except Exception as e:
         return {
             "status": "error",
@@ -90,6 +247,323 @@ async def process_uploaded_file(file: UploadFile = File(...)):
         }
 
 
+@app.post("/process-uploads")
+async def process_uploaded_files(files: List[UploadFile] = File(...)):
+    """
+    Extracts text from many uploaded files at once. Parsing fans out to a
+    bounded process pool; each file gets its own result, error and timing.
+    """
+    start = time.perf_counter()
+
+    async def extract(file: UploadFile) -> dict:
+        file_start = time.perf_counter()
+        try:
+            async with upload_budget.reserve(reservation_size(file)):
+                content = await read_upload(file)
+                result = await extraction_pool.extract(content, file.filename)
+            near_duplicates = await asyncio.to_thread(profile_index.find_near_duplicates, result["content"])
+            return {
+                "filename": file.filename,
+                "status": "success",
+                "content": result["content"],
+                "sections": result["sections"],
+                "near_duplicates": near_duplicates,
+                "pdf_report": result["pdf_report"],
+                "extraction_ms": result["extraction_ms"],
+                "total_ms": round((time.perf_counter() - file_start) * 1000, 2)
+            }
+        except asyncio.TimeoutError:
+            message = f"Timed out after {EXTRACTION_TIMEOUT_SECONDS:g}s"
+        except BrokenProcessPool:
+            message = "Extraction worker crashed on this file"
+        except Exception as e:
+            message = str(e)
+        return {
+            "filename": file.filename,
+            "status": "error",
+            "message": f"Failed to process file {file.filename}: {message}",
+            "total_ms": round((time.perf_counter() - file_start) * 1000, 2)
+        }
+
+    try:
+        results = await asyncio.gather(*(extract(file) for file in files))
+        succeeded = sum(1 for r in results if r["status"] == "success")
+        return {
+            "status": "success",
+            "files": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "took_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to process files: {str(e)}"
+        }
+
+
+def select_comparison_agent(data: dict):
+    """
+    Picks the Gemini ComparisonAgent, or the local rule-based scorer when
+    GOOGLE_API_KEY is missing or `scoring_mode` / SCORING_MODE is "local".
+    Returns (agent, scoring_mode).
+    """
+    scoring_mode = data.get("scoring_mode", os.getenv("SCORING_MODE", "llm"))
+    if scoring_mode == "local" or not os.getenv("GOOGLE_API_KEY"):
+        if scoring_mode != "local":
+            print("⚠️ GOOGLE_API_KEY not found. Using local scoring engine.")
+        return agent_registry.local_scoring_agent(), "local"
+    return agent_registry.comparison_agent(), "llm"
+
+
+async def apply_compaction(data: dict, jd_content, profiles_content: dict):
+    """
+    Compacts the JD and profile texts (page furniture, contact blocks, duplicate
+    lines) unless disabled with `compact: false` / COMPACT_PROFILES=false.
+    With `sections_only: true` / PROFILE_SECTIONS_ONLY=true only the resume
+    sections relevant to matching are kept. `jd_content` is one JD text or a
+    {name: text} dict of JDs, and is returned in the same shape.
+    Returns the compacted texts and a token usage report (None when disabled).
+    """
+    if str(data.get("compact", os.getenv("COMPACT_PROFILES", "true"))).lower() != "true":
+        return jd_content, profiles_content, None
+
+    sections_only = str(data.get("sections_only", os.getenv("PROFILE_SECTIONS_ONLY", "false"))).lower() == "true"
+    compacted_profiles, token_usage = await asyncio.to_thread(compact_profiles, profiles_content, sections_only)
+    jds = jd_content if isinstance(jd_content, dict) else {None: jd_content}
+    compacted_jds = {name: compact_text(text) for name, text in jds.items()}
+    token_usage["jd_tokens_before"] = sum(estimate_tokens(text) for text in jds.values())
+    token_usage["jd_tokens_after"] = sum(estimate_tokens(text) for text in compacted_jds.values())
+    print(f"🗜️ Compacted profiles: {token_usage['tokens_before']} → {token_usage['tokens_after']} tokens")
+    compacted_jd = compacted_jds if isinstance(jd_content, dict) else compacted_jds[None]
+    return compacted_jd, compacted_profiles, token_usage
+
+
+async def apply_dedupe(data: dict, profiles_content: dict):
+    """
+    Groups near-duplicate profiles (MinHash/LSH) so only one representative per
+    group is scored, unless disabled with `dedupe: false` / DEDUPE_PROFILES=false.
+    Returns the representatives and the duplicate groups (representative first).
+    """
+    if str(data.get("dedupe", os.getenv("DEDUPE_PROFILES", "true"))).lower() != "true":
+        return profiles_content, []
+
+    threshold = data.get("dedupe_threshold")
+    groups = await asyncio.to_thread(
+        find_duplicate_groups, profiles_content, float(threshold) if threshold else None
+    )
+    if not groups:
+        return profiles_content, []
+
+    duplicates = {name for group in groups for name in group[1:]}
+    print(f"🪞 Skipping {len(duplicates)} near-duplicate profile(s) in {len(groups)} group(s)")
+    return {name: text for name, text in profiles_content.items() if name not in duplicates}, groups
+
+
+async def apply_prefilter(data: dict, jd_content: str, profiles_content: dict):
+    """
+    Runs the optional TF-IDF pre-filter. Returns the profiles to compare and the
+    pre-filter score of every profile (None when the pre-filter is disabled).
+    """
+    prefilter_top_k = data.get("prefilter_top_k", os.getenv("PREFILTER_TOP_K"))
+    prefilter_threshold = data.get("prefilter_threshold", os.getenv("PREFILTER_THRESHOLD"))
+
+    if not (prefilter_top_k or prefilter_threshold):
+        return profiles_content, None
+
+    print("🧹 Running TF-IDF pre-filter...")
+    selected, prefilter_scores = await asyncio.to_thread(
+        prefilter_profiles,
+        jd_content,
+        profiles_content,
+        top_k=int(prefilter_top_k) if prefilter_top_k else None,
+        threshold=float(prefilter_threshold) if prefilter_threshold else None
+    )
+    print(f"🧹 Pre-filter kept {len(selected)}/{len(prefilter_scores)} profiles")
+    return selected, prefilter_scores
+
+
+async def send_notifications(ranked_profiles: list, jd_filename: str, ar_requestor_email: str, recruiter_email: str):
+    """Emails the AR requestor and recruiter; failures are logged, not raised."""
+    if ar_requestor_email:
+        try:
+            print("📧 Running Communication Agent...")
+            comm_agent = agent_registry.communication_agent()
+            await comm_agent.asend_notification(
+                ranked_profiles=ranked_profiles,
+                jd_info={"title": jd_filename},
+                ar_requestor_email=ar_requestor_email,
+                recruiter_email=recruiter_email or ar_requestor_email  # Use AR email as fallback for recruiter
+            )
+
+            print("✅ Email notification sent.")
+        except Exception as e:
+            print(f"⚠️ Email failed: {e}")
+    else:
+        print("ℹ️ Skipping email: missing AR requestor email")
+
+
+def build_comparison_doc(data: dict, comparisons: list, ranked_profiles: list) -> dict:
+    """Builds the ComparisonResult session document for a run."""
+    # Extract IDs and scores for storage
+    job_obj_id = ObjectId(data.get("jd_id") or "000000000000000000000000")  # fallback if needed
+    profile_ids = []
+    results = []
+    top_profiles = []
+
+    for result in comparisons:
+        print("📍Result entry:", result)  # helpful debug
+        pid = ObjectId(result.get("profile_id") or result.get("profileId"))  # robust key handling
+        profile_ids.append(pid)
+        results.append({
+            "profileId": pid,
+            "similarityScore": result["similarity_score"]  # ensure this key is correct too
+        })
+
+    for prof in ranked_profiles[:3]:
+        print("🏆 Top profile entry:", prof)  # helpful debug
+        top_profiles.append({
+            "profileId": ObjectId(prof.get("profile_id") or prof.get("profileId")),  # fixed
+            "similarityScore": prof["similarity_score"]
+        })
+
+    # Build document
+    return {
+        "jobIds": [job_obj_id],
+        "profileIds": profile_ids,
+        "results": results,
+        "topProfiles": top_profiles,
+        "createdBy": ObjectId(data.get("user_id")),  # Accept either key
+        "createdAt": datetime.utcnow()
+    }
+
+
+async def store_comparison_doc(comparison_doc: dict):
+    """
+    Queues a ComparisonResult session for the write-behind bulk writer; writes
+    it directly only when the writer's buffer is full.
+    """
+    if session_writer.submit(comparison_doc):
+        print("📝 Queued comparison session for DB write.")
+        return
+    await asyncio.to_thread(comparison_collection.insert_one, comparison_doc)
+    print("✅ Stored comparison session in DB.")
+
+
+async def run_comparison_pipeline(data: dict, progress=None, once=None) -> dict:
+    """
+    Runs comparison, ranking, notification and persistence for one JD.
+    Shared by /run-agent and the background job workers; `await progress(done,
+    total, skipped)` is called as comparison shards complete when provided.
+    `total` is the number of submitted profiles, `skipped` those removed by
+    the pre-filter; near-duplicates count as done with their representative.
+    For jobs, `await once(step)` guards the email and the stored session so a
+    retried job does not send or store them twice.
+    """
+    jd_filename = data.get("jd_filename")
+    jd_content = data.get("jd_content")
+    profiles_content = data.get("profiles_content", {})
+    ar_requestor_email = data.get("ar_email", os.getenv("AR_REQUESTOR_EMAIL"))
+    recruiter_email = data.get("recruiter_email", os.getenv("RECRUITER_EMAIL"))
+
+    # Validate input
+    if not jd_filename or not jd_content:
+        return {"status": "error", "message": "JD filename and content are required."}
+    if not profiles_content:
+        return {"status": "error", "message": "No profiles provided for comparison."}
+
+    submitted = len(profiles_content)
+
+    # Strip non-informative text before anything is scored or sent to the LLM
+    jd_content, profiles_content, token_usage = await apply_compaction(data, jd_content, profiles_content)
+
+    # Score one representative per group of near-duplicate resumes
+    profiles_content, duplicate_groups = await apply_dedupe(data, profiles_content)
+
+    # Optional: local TF-IDF pre-filter so only the most relevant profiles reach the LLM
+    profiles_content, prefilter_scores = await apply_prefilter(data, jd_content, profiles_content)
+    if not profiles_content:
+        return {
+            "status": "error",
+            "message": "No profiles passed the pre-filter.",
+            "prefilter_scores": prefilter_scores
+        }
+
+    # Run agents (local scoring engine when no API key is configured)
+    comparison_agent, scoring_mode = select_comparison_agent(data)
+    print(f"🔍 Running Comparison Agent ({scoring_mode})...")
+    if progress is None:
+        comparisons = await comparison_agent.acompare_documents(jd_content, profiles_content, jd_filename)
+    else:
+        # Stream shards so job progress (profiles scored / submitted) can be reported
+        duplicates_of = {group[0]: len(group) - 1 for group in duplicate_groups}
+        remaining = sum(1 + duplicates_of.get(name, 0) for name in profiles_content)
+        skipped = submitted - remaining
+        comparisons = []
+        done = 0
+        await progress(0, submitted, skipped)
+        async for shard_results in comparison_agent.astream_comparisons(jd_content, profiles_content):
+            comparisons.extend(shard_results)
+            done += sum(1 + duplicates_of.get(c.get("profile_name"), 0) for c in shard_results)
+            await progress(done, submitted, skipped)
+
+    if not comparisons:
+        return {"status": "error", "message": "No comparison results generated."}
+
+    cache_hits = sum(1 for c in comparisons if c.get("cached"))
+    print(f"💾 {cache_hits}/{len(comparisons)} comparison results served from cache")
+    comparisons = expand_duplicate_results(comparisons, duplicate_groups)
+
+    print("📊 Running Ranking Agent...")
+    ranking_agent = agent_registry.ranking_agent()
+    # Only the top matches are used unless a report needs the full ranking
+    generate_report = data.get("generate_report", False)
+    ranked_profiles = ranking_agent.rank_profiles(comparisons, top_k=None if generate_report else 3)
+
+    # Optional: Send email
+    if once is None or await once("notification"):
+        await send_notifications(ranked_profiles, jd_filename, ar_requestor_email, recruiter_email)
+    else:
+        print("ℹ️ Skipping email: already sent by an earlier attempt of this job")
+    
+    # print("🔬 Comparison Results:", comparisons)
+    # print("📦 Ranked Profiles:", ranked_profiles)
+
+
+    # Optional: Generate detailed report (only if requested)
+    detailed_report = None
+    
+    if generate_report and os.getenv("GOOGLE_API_KEY"):
+        print("📊 Running Report Agent...")
+        report_agent = agent_registry.report_agent()
+        detailed_report = await asyncio.to_thread(
+            report_agent.generate_report,
+            jd_content=jd_content,
+            comparison_results=ranked_profiles,
+            jd_title=jd_filename,
+            report_id=jd_filename
+        )
+
+    comparison_doc = build_comparison_doc(data, comparisons, ranked_profiles)
+
+    if once is None or await once("comparison_doc"):
+        await store_comparison_doc(comparison_doc)
+
+
+    return {
+        "status": "success",
+        "message": f"Agent workflow completed for '{jd_filename}'",
+        "top_3_matches": ranked_profiles[:3],
+        "detailed_report": detailed_report,
+        "cache_hits": cache_hits,
+        "prefilter_scores": prefilter_scores,
+        "token_usage": token_usage,
+        "duplicate_groups": duplicate_groups,
+        "scoring_mode": scoring_mode
+    }
+
+
 @app.post("/run-agent")
 async def run_agent(request: Request):
     """
@@ -99,145 +573,403 @@ async def run_agent(request: Request):
     try:
         print("🔔 Received request to /run-agent")
         data = await request.json()
+        return await run_comparison_pipeline(data)
 
-        jd_filename = data.get("jd_filename")
-        jd_content = data.get("jd_content")
-        profiles_content = data.get("profiles_content", {})
-        ar_requestor_email = data.get("ar_email", os.getenv("AR_REQUESTOR_EMAIL"))
-        recruiter_email = data.get("recruiter_email", os.getenv("RECRUITER_EMAIL"))
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to process request: {str(e)}"
+        }
 
-        # Validate input
-        if not jd_filename or not jd_content:
-            return {"status": "error", "message": "JD filename and content are required."}
-        if not profiles_content:
-            return {"status": "error", "message": "No profiles provided for comparison."}
 
-        # Handle mock response if no API key
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        if not google_api_key:
-            print("⚠️ GOOGLE_API_KEY not found. Returning mock response.")
-            return {
+def sse_event(event: str, payload: dict) -> str:
+    """Formats one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+@app.post("/run-agent/stream")
+async def run_agent_stream(request: Request):
+    """
+    Streaming variant of /run-agent. Emits Server-Sent Events:
+    `started`, one `partial` per completed comparison shard (with the current
+    ranked top-N), `ranked` once scoring is done, then `complete` after the
+    session is stored and notifications are sent (or `error`).
+    """
+    try:
+        print("🔔 Received request to /run-agent/stream")
+        data = await request.json()
+    except Exception as e:
+        return {"status": "error", "message": f"Failed to process request: {str(e)}"}
+
+    jd_filename = data.get("jd_filename")
+    jd_content = data.get("jd_content")
+    profiles_content = data.get("profiles_content", {})
+    ar_requestor_email = data.get("ar_email", os.getenv("AR_REQUESTOR_EMAIL"))
+    recruiter_email = data.get("recruiter_email", os.getenv("RECRUITER_EMAIL"))
+    top_n = int(data.get("top_n", 3))
+
+    # Validate input
+    if not jd_filename or not jd_content:
+        return {"status": "error", "message": "JD filename and content are required."}
+    if not profiles_content:
+        return {"status": "error", "message": "No profiles provided for comparison."}
+
+    async def events():
+        try:
+            jd_text, profiles, token_usage = await apply_compaction(data, jd_content, profiles_content)
+            profiles, duplicate_groups = await apply_dedupe(data, profiles)
+            profiles, prefilter_scores = await apply_prefilter(data, jd_text, profiles)
+            # Each scored representative also yields a result for its duplicates
+            duplicates_of = {group[0]: len(group) - 1 for group in duplicate_groups}
+            total = sum(1 + duplicates_of.get(name, 0) for name in profiles)
+            yield sse_event("started", {
+                "jd_filename": jd_filename,
+                "total_profiles": total,
+                "prefilter_scores": prefilter_scores,
+                "token_usage": token_usage,
+                "duplicate_groups": duplicate_groups
+            })
+            if not profiles:
+                yield sse_event("error", {"message": "No profiles passed the pre-filter."})
+                return
+
+            comparison_agent, scoring_mode = select_comparison_agent(data)
+            ranking_agent = agent_registry.ranking_agent()
+            # Shards are merged into a bounded heap instead of re-sorting everything per event
+            ranker = ranking_agent.ranker(max(top_n, 3))
+            comparisons = []
+
+            async for shard_results in comparison_agent.astream_comparisons(jd_text, profiles):
+                shard_results = expand_duplicate_results(shard_results, duplicate_groups)
+                comparisons.extend(shard_results)
+                ranker.add(shard_results)
+                yield sse_event("partial", {
+                    "scored": len(comparisons),
+                    "total": total,
+                    "top_matches": ranker.top()[:top_n]
+                })
+
+            if not comparisons:
+                yield sse_event("error", {"message": "No comparison results generated."})
+                return
+
+            ranked_profiles = ranker.top()
+            cache_hits = sum(1 for c in comparisons if c.get("cached"))
+            yield sse_event("ranked", {
+                "scored": len(comparisons),
+                "total": total,
+                "top_3_matches": ranked_profiles[:3],
+                "cache_hits": cache_hits
+            })
+
+            # Post-ranking stages run after the client already has the results
+            await send_notifications(ranked_profiles, jd_filename, ar_requestor_email, recruiter_email)
+            await store_comparison_doc(build_comparison_doc(data, comparisons, ranked_profiles))
+
+            yield sse_event("complete", {
                 "status": "success",
-                "message": f"Mock run complete for '{jd_filename}'",
-                "top_3_matches": [
-                    {
-                        "profile_name": "Mock Profile 1",
-                        "applicant_name": "John Doe",
-                        "similarity_score": 0.88,
-                        "reasoning": "Strong Python and ML experience"
-                    },
-                    {
-                        "profile_name": "Mock Profile 2",
-                        "applicant_name": "Jane Smith",
-                        "similarity_score": 0.77,
-                        "reasoning": "Good overlap but missing key tech"
-                    },
-                    {
-                        "profile_name": "Mock Profile 3",
-                        "applicant_name": "Alex Patel",
-                        "similarity_score": 0.69,
-                        "reasoning": "Partial skill match"
-                    }
-                ]
-            }
+                "message": f"Agent workflow completed for '{jd_filename}'",
+                "top_3_matches": ranked_profiles[:3],
+                "cache_hits": cache_hits,
+                "prefilter_scores": prefilter_scores,
+                "duplicate_groups": duplicate_groups,
+                "scoring_mode": scoring_mode
+            })
+
+        except Exception as e:
+            yield sse_event("error", {"message": f"Failed to process request: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-        # Run agents
-        print("🔍 Running Comparison Agent...")
-        comparison_agent = ComparisonAgent(google_api_key=google_api_key)
-        comparisons = comparison_agent.compare_documents(jd_content, profiles_content, jd_filename)
-
-        if not comparisons:
-            return {"status": "error", "message": "No comparison results generated."}
-
-        print("📊 Running Ranking Agent...")
-        ranking_agent = RankingAgent()
-        ranked_profiles = ranking_agent.rank_profiles(comparisons)
-
-        # Optional: Send email
-        if ar_requestor_email:
-            try:
-                print("📧 Running Communication Agent...")
-                comm_agent = CommunicationAgent()
-                comm_agent.send_notification(
-                    ranked_profiles=ranked_profiles,
-                    jd_info={"title": jd_filename},
-                    ar_requestor_email=ar_requestor_email,
-                    recruiter_email=recruiter_email or ar_requestor_email  # Use AR email as fallback for recruiter
-                )
-
-                print("✅ Email notification sent.")
-            except Exception as e:
-                print(f"⚠️ Email failed: {e}")
+
+def load_documents_by_id(collection, ids: list, text_field: str, name_field: str):
+    """
+    Fetches documents by ObjectId in a single `$in` query.
+    Returns ({id: text}, {id: display name}, {id: "invalid" | "not_found"});
+    bad IDs are reported per ID instead of failing the whole request.
+    """
+    texts, names, missing = {}, {}, {}
+    valid = []
+    for i in ids:
+        if ObjectId.is_valid(str(i)):
+            valid.append(str(i))
         else:
-            print("ℹ️ Skipping email: missing AR requestor email")
-        
-        # print("🔬 Comparison Results:", comparisons)
-        # print("📦 Ranked Profiles:", ranked_profiles)
-
-
-        # Optional: Generate detailed report (only if requested)
-        generate_report = data.get("generate_report", False)
-        detailed_report = None
-        
-        if generate_report:
-            print("📊 Running Report Agent...")
-            report_agent = ReportAgent(google_api_key=google_api_key)
-            detailed_report = report_agent.generate_report(
-                jd_content=jd_content,
-                comparison_results=ranked_profiles,
-                jd_title=jd_filename,
-                report_id=jd_filename
+            missing[str(i)] = "invalid"
+    if valid:
+        cursor = collection.find({"_id": {"$in": [ObjectId(i) for i in set(valid)]}}, {text_field: 1, name_field: 1})
+        for record in cursor:
+            key = str(record["_id"])
+            texts[key] = record.get(text_field) or ""
+            names[key] = record.get(name_field) or key
+    for i in valid:
+        if i not in texts:
+            missing[i] = "not_found"
+    return texts, names, missing
+
+
+@app.post("/run-agent/matrix")
+async def run_agent_matrix(request: Request):
+    """
+    Scores N JDs against M profiles in one request.
+
+    JDs come from `jds_content` ({name: text}) and/or `jd_ids`
+    (jobdescriptions), profiles from `profiles_content` and/or `profile_ids`
+    (consultantprofiles; keyed by ID in the response). Each document is
+    compacted and deduplicated once and each unique pair is scored once.
+    Returns the score matrix (rows = JDs, columns = profiles, null where a
+    pair could not be scored) with the top-k profiles per JD and the top-k
+    JDs per profile. IDs that are malformed or not in the database are
+    listed under `missing_ids` and left out of the matrix. Nothing is
+    emailed or stored.
+    """
+    try:
+        print("🔔 Received request to /run-agent/matrix")
+        start = time.perf_counter()
+        data = await request.json()
+        try:
+            top_k = int(data.get("top_k", 3))
+        except (TypeError, ValueError):
+            top_k = 0
+        if top_k < 1:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "top_k must be a positive integer."})
+
+        jds = dict(data.get("jds_content") or {})
+        profiles = dict(data.get("profiles_content") or {})
+        jd_labels, profile_labels = {}, {}
+        missing_ids = {"jd_ids": {}, "profile_ids": {}}
+        if data.get("jd_ids"):
+            texts, jd_labels, missing_ids["jd_ids"] = await asyncio.to_thread(
+                load_documents_by_id, jd_collection, data["jd_ids"], "content", "title"
             )
+            jds.update(texts)
+        if data.get("profile_ids"):
+            texts, profile_labels, missing_ids["profile_ids"] = await asyncio.to_thread(
+                load_documents_by_id, profile_collection, data["profile_ids"], "resumeText", "name"
+            )
+            profiles.update(texts)
+
+        if not jds:
+            return {"status": "error", "message": "At least one JD (jds_content or jd_ids) is required.", "missing_ids": missing_ids}
+        if not profiles:
+            return {"status": "error", "message": "No profiles provided for comparison.", "missing_ids": missing_ids}
+
+        jd_names, profile_names = list(jds), list(profiles)
+
+        # Per-document preprocessing runs once, not once per pair
+        jds, profiles, token_usage = await apply_compaction(data, jds, profiles)
+        profiles, duplicate_groups = await apply_dedupe(data, profiles)
+
+        comparison_agent, scoring_mode = select_comparison_agent(data)
+        print(f"🔍 Scoring {len(jd_names)} JD(s) × {len(profile_names)} profile(s) ({scoring_mode})...")
+        by_jd = await comparison_agent.acompare_matrix(jds, profiles)
+
+        ranking_agent = agent_registry.ranking_agent()
+        column = {name: j for j, name in enumerate(profile_names)}
+        scores = np.full((len(jd_names), len(profile_names)), np.nan)
+        top_profiles = {}
+        cache_hits = 0
+        for i, jd_name in enumerate(jd_names):
+            results = by_jd.get(jd_name, [])
+            cache_hits += sum(1 for r in results if r.get("cached"))
+            results = expand_duplicate_results(results, duplicate_groups)
+            for result in results:
+                j = column.get(result.get("profile_name"))
+                if j is not None:
+                    scores[i, j] = float(result.get("similarity_score") or 0.0)
+            top_profiles[jd_name] = ranking_agent.rank_profiles(results, top_k=top_k)
+
+        # Best JDs for each profile; ties keep JD order
+        order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), axis=0, kind="stable")[:top_k]
+        top_jds = {
+            name: [
+                {"jd_name": jd_names[i], "similarity_score": round(float(scores[i, j]), 3)}
+                for i in order[:, j] if not np.isnan(scores[i, j])
+            ]
+            for j, name in enumerate(profile_names)
+        }
 
-            # Extract IDs and scores for storage
-        job_obj_id = ObjectId(data.get("jd_id") or "000000000000000000000000")  # fallback if needed
-        profile_ids = []
-        results = []
-        top_profiles = []
-        
-        for result in comparisons:
-            print("📍Result entry:", result)  # helpful debug
-            pid = ObjectId(result.get("profile_id") or result.get("profileId"))  # robust key handling
-            profile_ids.append(pid)
-            results.append({
-                "profileId": pid,
-                "similarityScore": result["similarity_score"]  # ensure this key is correct too
-        })
+        unique_jds = len(set(jds.values()))
+        return {
+            "status": "success",
+            "jd_names": jd_names,
+            "profile_names": profile_names,
+            "jd_labels": jd_labels,
+            "profile_labels": profile_labels,
+            "missing_ids": missing_ids,
+            "scores": [[None if np.isnan(v) else round(float(v), 3) for v in row] for row in scores],
+            "top_profiles_per_jd": top_profiles,
+            "top_jds_per_profile": top_jds,
+            "pairs": len(jd_names) * len(profile_names),
+            "unique_pairs": unique_jds * len(profiles),
+            "cache_hits": cache_hits,
+            "duplicate_groups": duplicate_groups,
+            "token_usage": token_usage,
+            "scoring_mode": scoring_mode,
+            "took_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
 
-        for prof in ranked_profiles[:3]:
-            print("🏆 Top profile entry:", prof)  # helpful debug
-            top_profiles.append({
-                "profileId": ObjectId(prof.get("profile_id") or prof.get("profileId")),  # fixed
-                "similarityScore": prof["similarity_score"]
-        })
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to process request: {str(e)}"
+        }
 
 
-        # Build and insert document
-        comparison_doc = {
-            "jobIds": [job_obj_id],
-            "profileIds": profile_ids,
-            "results": results,
-            "topProfiles": top_profiles,
-            "createdBy": ObjectId(data.get("user_id")),  # Accept either key
-            "createdAt": datetime.utcnow()
+async def run_comparison_job(payload: dict, progress, once) -> dict:
+    """Job handler for queued /run-agent payloads."""
+    result = await run_comparison_pipeline(payload, progress=progress, once=once)
+    if result.get("status") == "error":
+        raise RuntimeError(result.get("message"))
+    return result
+
+
+# Persistent background job queue (SQLite) drained by in-process workers
+job_queue = JobQueue()
+job_workers = JobWorkerPool(job_queue, {"run-agent": run_comparison_job})
+
+
+@app.post("/jobs")
+async def submit_job(request: Request):
+    """
+    Queues a /run-agent payload as a background job and returns its job ID.
+    Poll GET /jobs/{job_id} or subscribe to GET /jobs/{job_id}/events.
+    """
+    try:
+        data = await request.json()
+
+        # Validate input
+        if not data.get("jd_filename") or not data.get("jd_content"):
+            return {"status": "error", "message": "JD filename and content are required."}
+        if not data.get("profiles_content"):
+            return {"status": "error", "message": "No profiles provided for comparison."}
+
+        job_id = await asyncio.to_thread(
+            job_queue.submit, "run-agent", data, len(data["profiles_content"])
+        )
+        job_workers.notify()
+        print(f"📥 Queued job {job_id}")
+        return {"status": "success", "job_id": job_id, "job_status": "queued"}
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to queue job: {str(e)}"
         }
 
-        # print("📝 Inserting comparison doc:", comparison_doc)
-        comparison_collection.insert_one(comparison_doc)
-        print("✅ Stored comparison session in DB.")
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Returns a job's status, progress and (once finished) result or error."""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        return {"status": "error", "message": f"Job {job_id} not found."}
+    return {"status": "success", "job": job}
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-Sent Events stream of a job's progress until it finishes."""
+    async def events():
+        last = None
+        while True:
+            job = await asyncio.to_thread(job_queue.get, job_id)
+            if job is None:
+                yield sse_event("error", {"message": f"Job {job_id} not found."})
+                return
+            snapshot = (job["status"], job["progress"]["done"], job["progress"]["total"])
+            if snapshot != last:
+                last = snapshot
+                yield sse_event("progress", {"job_id": job_id, "status": job["status"], "progress": job["progress"]})
+            if job["status"] in TERMINAL_STATES:
+                yield sse_event(job["status"], job)
+                return
+            await asyncio.sleep(1.0)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/profiles/{profile_id}/pdf")
+async def stream_profile_pdf(profile_id: str, inline: bool = False):
+    """
+    Streams a consultant's resume PDF in chunks. Works for Binary, GridFS and
+    legacy base64 storage; GridFS files are never loaded into memory whole.
+    """
+    try:
+        if not ObjectId.is_valid(profile_id):
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Invalid profile ID."})
+        record = await asyncio.to_thread(
+            profile_collection.find_one,
+            {"_id": ObjectId(profile_id)},
+            {"name": 1, "pdfFile": 1}
+        )
+        pdf = (record or {}).get("pdfFile") or {}
+        if not (pdf.get("data") or pdf.get("gridfsId")):
+            return JSONResponse(status_code=404, content={"status": "error", "message": "PDF not found."})
+
+        filename = f"{(record.get('name') or 'resume').replace(' ', '_')}.pdf"
+        headers = {"Content-Disposition": f'{"inline" if inline else "attachment"}; filename="{filename}"'}
+        # Sync generator: Starlette iterates it in a worker thread
+        return StreamingResponse(
+            pdf_storage.iter_chunks(pdf),
+            media_type=pdf.get("mimeType", "application/pdf"),
+            headers=headers
+        )
+
+    except Exception as e:
+        return JSONResponse(status_code=500, content={
+            "status": "error",
+            "message": f"Failed to read profile PDF: {str(e)}"
+        })
 
+
+@app.post("/search")
+async def search_profiles(request: Request):
+    """
+    Returns the top-N stored consultant profiles for a JD using the local
+    profile index (no LLM call).
+    """
+    try:
+        data = await request.json()
+        jd_content = data.get("jd_content")
+        top_n = int(data.get("top_n", 10))
+
+        if not jd_content:
+            return {"status": "error", "message": "JD content is required."}
+
+        start = time.perf_counter()
+        results = profile_index.search(jd_content, top_n=top_n)
         return {
             "status": "success",
-            "message": f"Agent workflow completed for '{jd_filename}'",
-            "top_3_matches": ranked_profiles[:3],
-            "detailed_report": detailed_report
+            "results": results,
+            "indexed_profiles": profile_index.stats()["profiles"],
+            "took_ms": round((time.perf_counter() - start) * 1000, 2)
         }
 
     except Exception as e:
         return {
             "status": "error",
-            "message": f"Failed to process request: {str(e)}"
+            "message": f"Failed to search profiles: {str(e)}"
+        }
+
+
+@app.post("/index/sync")
+async def sync_profile_index():
+    """Forces a reconciliation of the profile index with Mongo."""
+    try:
+        summary = await asyncio.to_thread(profile_index.sync, profile_collection)
+        return {"status": "success", **summary}
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to sync profile index: {str(e)}"
         }
 
 
@@ -291,8 +1023,9 @@ async def generate_report(request: Request):
 
         # Generate report
         print("📊 Running Report Agent...")
-        report_agent = ReportAgent(google_api_key=google_api_key)
-        detailed_report = report_agent.generate_report(
+        report_agent = agent_registry.report_agent()
+        detailed_report = await asyncio.to_thread(
+            report_agent.generate_report,
             jd_content=jd_content,
             comparison_results=comparison_results,
             jd_title=jd_title,
@@ -333,6 +1066,7 @@ async def generate_jd_report(request: Request):
         google_api_key = os.getenv("GOOGLE_API_KEY")
         if not google_api_key:
             print("⚠️ GOOGLE_API_KEY not found. Returning mock JD report.")
+            jd_skills = sorted(agent_registry.skill_matcher().extract(jd_content))
             return {
                 "status": "success",
                 "message": "Mock JD report generated",
@@ -343,7 +1077,7 @@ async def generate_jd_report(request: Request):
                     "jd_analysis": {
                         "role_overview": "Mock role overview for demonstration",
                         "key_responsibilities": ["Mock responsibility 1", "Mock responsibility 2"],
-                        "required_skills": ["Mock skill 1", "Mock skill 2"],
+                        "required_skills": jd_skills or ["Mock skill 1", "Mock skill 2"],
                         "preferred_qualifications": ["Mock qualification 1"],
                         "experience_level": "Mid-level",
                         "industry_context": "Technology",
@@ -360,8 +1094,8 @@ async def generate_jd_report(request: Request):
 
         # Generate JD report
         print("📋 Running Report Agent for JD...")
-        report_agent = ReportAgent(google_api_key=google_api_key)
-        jd_report = report_agent.generate_jd_report(
+        report_agent = agent_registry.report_agent()
+        jd_report = await report_agent.agenerate_jd_report(
             jd_content=jd_content,
             jd_title=jd_title,
             report_id=report_id
@@ -401,6 +1135,8 @@ async def generate_profile_report(request: Request):
         google_api_key = os.getenv("GOOGLE_API_KEY")
         if not google_api_key:
             print("⚠️ GOOGLE_API_KEY not found. Returning mock profile report.")
+            profile_skills = sorted(agent_registry.skill_matcher().extract(profile_content))
+            technical_skills = sorted(agent_registry.skill_matcher().extract(profile_content, "technical"))
             return {
                 "status": "success",
                 "message": "Mock profile report generated",
@@ -410,7 +1146,7 @@ async def generate_profile_report(request: Request):
                     "analysis_date": "2024-01-01 12:00:00",
                     "profile_analysis": {
                         "profile_summary": "Mock profile summary for demonstration",
-                        "key_skills": ["Mock skill 1", "Mock skill 2"],
+                        "key_skills": profile_skills or ["Mock skill 1", "Mock skill 2"],
                         "years_experience": "3-5 years",
                         "industry_focus": ["Technology", "Finance"],
                         "best_job_roles": [
@@ -431,7 +1167,7 @@ async def generate_profile_report(request: Request):
                                 "profile_skills": ["Team Management", "System Design"]
                             }
                         ],
-                        "keywords_for_search": ["JavaScript", "React", "Node.js", "Full Stack"],
+                        "keywords_for_search": technical_skills or ["JavaScript", "React", "Node.js", "Full Stack"],
                         "career_recommendations": ["Mock recommendation 1", "Mock recommendation 2"]
                     },
                     "executive_summary": "Mock executive summary for profile analysis",
@@ -442,8 +1178,8 @@ async def generate_profile_report(request: Request):
 
         # Generate profile report
         print("👤 Running Report Agent for Profile...")
-        report_agent = ReportAgent(google_api_key=google_api_key)
-        profile_report = report_agent.generate_profile_report(
+        report_agent = agent_registry.report_agent()
+        profile_report = await report_agent.agenerate_profile_report(
             profile_content=profile_content,
             profile_title=profile_title,
             report_id=report_id
@@ -461,18 +1197,3 @@ async def generate_profile_report(request: Request):
             "message": f"Failed to generate profile report: {str(e)}"
         }
 
-
-if __name__ == "__main__":
-    print("🚀 Starting agent server...")
-    print("📡 Available at: http://localhost:8000")
-    print("🏥 Health check: http://localhost:8000/health")
-    print("📄 Upload endpoint: http://localhost:8000/process-upload")
-    print("🤖 Run Agent endpoint: http://localhost:8000/run-agent")
-    print("📊 Generate Report endpoint: http://localhost:8000/generate-report")
-    print("📋 Generate JD Report endpoint: http://localhost:8000/generate-jd-report")
-    print("👤 Generate Profile Report endpoint: http://localhost:8000/generate-profile-report")
-    # Render provides PORT environment variable; default to 8000 locally.
-    # Disable reload by default in production; enable by setting RELOAD=true.
-    port = int(os.getenv("PORT", "8000"))
-    reload_flag = os.getenv("RELOAD", "true").lower() == "true"
-    uvicorn.run("server:app", host="0.0.0.0", port=port, reload=reload_flag)
\ No newline at end of file
@@ -1,10 +1,23 @@
 import { NextResponse } from "next/server";
-import { Types } from "mongoose";
+import { Readable } from "stream";
+import mongoose, { Types } from "mongoose";
 import dbConnect from "@/lib/database";
 import ConsultantProfile from "@/models/ConsultantProfile";
 
+// Must match PDF_GRIDFS_BUCKET in the Python service
+const GRIDFS_BUCKET = process.env.PDF_GRIDFS_BUCKET || "profilePdfs";
+
+// pdfFile.data is a BSON Binary (lean) or Buffer after migration, a base64 string before
+function pdfBytes(data: any): Buffer | null {
+  if (!data) return null;
+  if (typeof data === "string") return Buffer.from(data, "base64");
+  if (Buffer.isBuffer(data)) return data;
+  if (data.buffer) return Buffer.from(data.buffer);
+  return null;
+}
+
 export async function GET(
-  _req: Request,
+  req: Request,
   { params }: { params: { profileId: string } }
 ) {
   try {
@@ -27,21 +40,31 @@ export async function GET(
     if (!doc) {
       return NextResponse.json({ error: "Profile not found" }, { status: 404 });
     }
-    if (!doc || !(doc as any).pdfFile?.data) {
+    const pdfFile = (doc as any).pdfFile;
+    if (!pdfFile?.data && !pdfFile?.gridfsId) {
       return NextResponse.json({ error: "PDF not found" }, { status: 404 });
     }
 
-    const buf = Buffer.from((doc as any).pdfFile.data, "base64");
     const filename = `${(((doc as any).name || "resume") as string).replace(/\s+/g, "_")}.pdf`;
+    const inline = new URL(req.url).searchParams.get("inline") === "1";
+    const headers = {
+      "Content-Type": "application/pdf",
+      "Content-Disposition": `${inline ? "inline" : "attachment"}; filename="${filename}"`,
+      "Cache-Control": "no-store",
+    };
 
-    return new NextResponse(buf, {
-      status: 200,
-      headers: {
-        "Content-Type": "application/pdf",
-        "Content-Disposition": `attachment; filename="${filename}"`,
-        "Cache-Control": "no-store",
-      },
-    });
+    // Large files live in GridFS and are streamed chunk by chunk
+    if (pdfFile.gridfsId) {
+      const bucket = new mongoose.mongo.GridFSBucket(mongoose.connection.db!, { bucketName: GRIDFS_BUCKET });
+      const stream = bucket.openDownloadStream(new Types.ObjectId(String(pdfFile.gridfsId)));
+      return new NextResponse(Readable.toWeb(stream) as ReadableStream, { status: 200, headers });
+    }
+
+    const buf = pdfBytes(pdfFile.data);
+    if (!buf) {
+      return NextResponse.json({ error: "PDF not found" }, { status: 404 });
+    }
+    return new NextResponse(buf, { status: 200, headers });
   } catch (e: any) {
     console.error("profile-pdf error:", e);
     return NextResponse.json({ error: e.message }, { status: 500 });
@@ -1,13 +1,36 @@
 import { NextRequest, NextResponse } from 'next/server';
+import mongoose, { Types } from 'mongoose';
 import dbConnect from '@/lib/database';
 import ConsultantProfile from '@/models/ConsultantProfile';
 import User from '@/models/User';
 import pdf from 'pdf-parse';
 
+// Must match PDF_GRIDFS_BUCKET / PDF_GRIDFS_THRESHOLD_MB in the Python service (utils/pdf_storage.py)
+const GRIDFS_BUCKET = process.env.PDF_GRIDFS_BUCKET || 'profilePdfs';
+const GRIDFS_THRESHOLD_BYTES = Number(process.env.PDF_GRIDFS_THRESHOLD_MB || '8') * 1024 * 1024;
+
+function gridfsBucket() {
+  return new mongoose.mongo.GridFSBucket(mongoose.connection.db!, { bucketName: GRIDFS_BUCKET });
+}
+
+// Same layout as PdfStorage.encode: inline BSON Binary, or a GridFS file above the threshold
+async function encodePdf(data: Buffer, mimeType: string, filename: string) {
+  if (data.length <= GRIDFS_THRESHOLD_BYTES) {
+    return { data, mimeType, size: data.length, encoding: 'binary' as const };
+  }
+  const gridfsId = await new Promise<Types.ObjectId>((resolve, reject) => {
+    const upload = gridfsBucket().openUploadStream(filename, { metadata: { mimeType } });
+    upload.once('finish', () => resolve(upload.id as Types.ObjectId));
+    upload.once('error', reject);
+    upload.end(data);
+  });
+  return { gridfsId, mimeType, size: data.length, encoding: 'gridfs' as const };
+}
+
 export async function POST(req: NextRequest) {
   try {
     const body = await req.json();
-    const { name, pdfFile, content } = body;
+    const { name, pdfFile, content, sections } = body;
 
     // Validate required fields
     if (!name || !pdfFile?.data || !pdfFile?.mimeType) {
@@ -56,19 +79,41 @@ export async function POST(req: NextRequest) {
       }
     }
 
-    // Save full PDF (as base64) + extracted text
-    const profile = await ConsultantProfile.create({
-      name,
-      resumeText,
-      uploadedBy: user._id,
-      pdfFile: {
-        data: pdfFile.data,
-        mimeType: pdfFile.mimeType,
-        size: pdfFile.size,
-      },
-    });
+    // Sections only describe text extracted upstream; drop them for locally parsed files
+    const resumeSections =
+      typeof content === 'string' && content.trim().length > 0 && sections && typeof sections === 'object'
+        ? sections
+        : undefined;
 
-    return NextResponse.json(profile, { status: 201 });
+    // Save full PDF (as raw binary, not base64) + extracted text
+    const storedPdf = await encodePdf(
+      Buffer.from(pdfFile.data, 'base64'),
+      pdfFile.mimeType,
+      `${name.replace(/ /g, '_')}.pdf`
+    );
+    let profile;
+    try {
+      profile = await ConsultantProfile.create({
+        name,
+        resumeText,
+        resumeSections,
+        uploadedBy: user._id,
+        pdfFile: storedPdf,
+      });
+    } catch (err) {
+      // Don't leave an orphaned GridFS file behind
+      if ('gridfsId' in storedPdf) {
+        await gridfsBucket().delete(storedPdf.gridfsId).catch(() => undefined);
+      }
+      throw err;
+    }
+
+    // Don't echo the file bytes back to the client
+    const { pdfFile: stored, ...saved } = profile.toObject();
+    return NextResponse.json(
+      { ...saved, pdfFile: { mimeType: stored.mimeType, size: stored.size, encoding: stored.encoding } },
+      { status: 201 }
+    );
 
   } catch (error) {
     console.error('Profile Upload Error:', error);
@@ -79,7 +124,11 @@ export async function POST(req: NextRequest) {
 export async function GET() {
   try {
     await dbConnect();
-    const profiles = await ConsultantProfile.find().sort({ createdAt: -1 });
+    // PDF bytes are served by /api/profile-pdf/[profileId]; keep the list light
+    const profiles = await ConsultantProfile.find()
+      .select('-pdfFile.data')
+      .sort({ createdAt: -1 })
+      .lean();
     return NextResponse.json(profiles);
   } catch (error) {
     console.error('Profile Fetch Error:', error);
@@ -96,6 +145,11 @@ export async function DELETE(req: NextRequest) {
     if (!deleted) {
       return NextResponse.json({ error: 'Profile not found' }, { status: 404 });
     }
+    if (deleted.pdfFile?.gridfsId) {
+      await gridfsBucket().delete(deleted.pdfFile.gridfsId).catch((err) => {
+        console.error('⚠️ Could not delete GridFS file for profile:', err);
+      });
+    }
 
     return NextResponse.json({ success: true });
   } catch (error) {
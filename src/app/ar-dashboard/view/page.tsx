@@ -25,9 +25,11 @@ interface UploadedFile {
   name: string;
   content: string;
   pdfFile?: {
-    data: string;
+    data?: string;
     mimeType: string;
   };
+  // Served by /api/profile-pdf when the file bytes are not in the list response
+  pdfUrl?: string;
 }
 
 function DetailsCard({ item }: { item: UploadedFile | null }) {
@@ -38,9 +40,11 @@ function DetailsCard({ item }: { item: UploadedFile | null }) {
     item.pdfFile?.mimeType ===
       "application/vnd.openxmlformats-officedocument.wordprocessingml.document";
 
-  const src = isDocument
+  const src = !isDocument
+    ? undefined
+    : item.pdfFile?.data
     ? `data:${item.pdfFile?.mimeType};base64,${item.pdfFile?.data}`
-    : undefined;
+    : item.pdfUrl;
 
   return (
     <Card>
@@ -122,6 +126,7 @@ export default function ViewPage() {
                 name: d.name,
                 content: d.resumeText,
                 pdfFile: d.pdfFile,
+                pdfUrl: `/api/profile-pdf/${d._id}?inline=1`,
               }));
         setFiles(parsed);
       })
@@ -92,11 +92,13 @@ export default function UploadPage() {
 
   const uploadToBackend = async (file: File, type: "jds" | "profiles") => {
     let processedContent = "";
+    let processedSections: Record<string, string> | undefined;
 
     if (backendStatus === "online") {
       try {
         const processed = await uploadToProcessingServer(file);
         processedContent = processed.content || "";
+        processedSections = processed.sections;
       } catch (err) {
         console.warn(`Processing server failed for ${file.name}`, err);
         processedContent = await file.text();
@@ -118,6 +120,7 @@ export default function UploadPage() {
         : {
             name: file.name,
             content: processedContent,
+            sections: processedSections,
             pdfFile: { data: base64Data, mimeType: file.type, size: file.size },
           };
 
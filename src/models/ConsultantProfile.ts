@@ -3,10 +3,14 @@ import mongoose, { Document, Schema, Types } from "mongoose";
 export interface IConsultantProfile extends Document {
   name: string;
   resumeText: string;
+  resumeSections?: Record<string, string>; // labeled sections from the Python loader
   pdfFile: {
-    data: string;
+    // Raw bytes (BSON Binary); legacy documents hold a base64 string; absent when stored in GridFS
+    data?: Buffer | string;
     mimeType: string;
     size?: number;
+    encoding?: "binary" | "gridfs" | "base64";
+    gridfsId?: Types.ObjectId;
   };
   uploadedBy: Types.ObjectId;
   createdAt: Date;
@@ -16,10 +20,13 @@ const ConsultantProfileSchema = new Schema<IConsultantProfile>(
   {
     name: { type: String, required: true },
     resumeText: { type: String, required: true },
+    resumeSections: { type: Map, of: String, required: false },
     pdfFile: {
-      data: { type: String, required: true }, // base64-encoded
+      data: { type: Schema.Types.Mixed, required: false }, // Buffer, or base64 string before migration
       mimeType: { type: String, required: true }, // should be 'application/pdf'
       size: { type: Number, required: false },
+      encoding: { type: String, enum: ["binary", "gridfs", "base64"], required: false },
+      gridfsId: { type: Schema.Types.ObjectId, required: false }, // file in the profilePdfs GridFS bucket
     },
     uploadedBy: { type: Schema.Types.ObjectId, ref: "User", required: true },
   },